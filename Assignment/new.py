@@ -1,10 +1,17 @@
 import tkinter as tk
 from tkinter import messagebox, ttk # ttk for themed widgets like Combobox
-import random
-import heapq
+import os
+import queue
+import sys
+import threading
 import time
 from collections import deque
 
+import puzzle_history # One byte per move undo/redo history
+import puzzle_replay  # Append-only binary game logs
+import puzzle_solver # Headless solver library shared with solve_puzzles.py
+import puzzle_table  # Precomputed 3x3 distance table
+
 # --- Game Constants ---
 SIZE = 3 # For 3x3 puzzle (8-puzzle)
 
@@ -28,23 +35,113 @@ FONT_SIZE_LABEL = 14
 FONT_SIZE_BUTTON = 12
 ANIMATION_DELAY_MS = 150 # Faster animation
 HINT_FLASH_DELAY_MS = 400 # How long hint tile flashes
+CLICK_FEEDBACK_MS = 80 # How long a moved tile stays highlighted
+VICTORY_FLASH_MS = 200
+LATENCY_WINDOW = 100 # Moves averaged in the debug latency readout
+SOLVER_POLL_MS = 50 # How often the Tk thread checks for finished background solves
+CANVAS_MIN_SIZE = 8 # Boards this big are drawn on one Canvas instead of a grid of Buttons
+CANVAS_BOARD_PX = 400 # Width and height of the Canvas board
+
+# Search budgets: past these, the solver gives back its best path so far with a bound
+HINT_TIME_LIMIT_S = 2
+MIN_MOVES_TIME_LIMIT_S = 5
+SOLVE_TIME_LIMIT_S = 30
+ANYTIME_TIME_LIMIT_S = 10 # ARA* keeps improving its path until this runs out
+SOLVER_MEMORY_CAP_MB = 512
+PATH_CACHE_MAX_STATES = 100000 # States kept in the session's optimal path cache
+HISTORY_CAP_MOVES = puzzle_history.DEFAULT_HISTORY_CAP # Undo steps kept, oldest dropped first
+SOLVE_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solve_profile.prof")
+
+STOP_REASON_TEXT = {
+    "node_budget": "Node budget hit",
+    "deadline": "Time limit hit",
+    "memory": "Memory cap hit",
+}
+
+# Algorithm combobox labels -> puzzle_solver algorithm names
+ALGORITHM_NAMES = {
+    "A* Search": "astar",
+    "ARA* (anytime)": "arastar",
+    "IDA*": "idastar",
+    "BFS": "bfs",
+    "Iterative DFS": "dfs",
+    "Distance Table": "table",
+}
+
+# Arrow keys slide the tile on that side of the empty tile towards it, so the empty
+# tile itself moves the opposite way (puzzle_solver move codes: 0 U, 1 D, 2 L, 3 R)
+ARROW_KEY_MOVES = {
+    "<Up>": 1,
+    "<Down>": 0,
+    "<Left>": 3,
+    "<Right>": 2,
+}
+
+# Heuristic combobox labels -> puzzle_solver heuristic names (A* only)
+HEURISTIC_NAMES = {
+    "Manhattan": "manhattan",
+    "Linear Conflict": "linear_conflict",
+    "Walking Distance": "walking_distance",
+    "Pattern Database": "pdb",
+}
 
 class SlidingPuzzle:
-    def __init__(self, root):
+    def __init__(self, root, size=SIZE, board=None, debug=False, log_games=True):
         self.root = root
-        self.root.title("Sliding Puzzle - 8 Puzzle")
-        self.root.geometry("420x650") # Adjust size for new elements
+        self.debug = debug # Show per-move input latency
+        self.log_games = log_games # Write every game to puzzle_replay.REPLAY_DIR
+        self.game_log = None # puzzle_replay.GameLog of the current game
+        self.size = size # Board is size x size, from 2 up to puzzle_solver.MAX_SIZE
+        # "buttons" or "canvas"; by default the Canvas takes over from CANVAS_MIN_SIZE up
+        self.board = board or ("canvas" if size >= CANVAS_MIN_SIZE else "buttons")
+        self.root.title(f"Sliding Puzzle - {size*size - 1} Puzzle")
+        if size == SIZE:
+            self.root.geometry("420x760") # Adjust size for new elements
+        # Other sizes let Tk fit the window to the board
         self.root.resizable(False, False)
         self.root.configure(bg=BG_COLOR)
 
         self.tiles = []
         self.buttons = []
+        self.canvas = None
+        self.canvas_items = {} # (row, col) -> (rectangle id, text id) on the Canvas board
+        self.tile_style = {} # (row, col) -> (text, bg, state) as last drawn, see _paint
+        self.solved = None # Solved flag as of the last redraw
+        self.empty_pos = None # (row, col) of the empty tile as of the last redraw
+        self.highlighted_cells = set() # Tiles drawn in a highlight colour by the last redraw
+        self.hover_cell = None
         self.move_count = 0
+
+        # --- Move input queue (see queue_move) ---
+        self.pending_moves = deque() # (target, perf_counter time queued); target is (row, col) or a move code
+        self.moves_scheduled = False
+        self.feedback_after_id = None # Pending after() that clears the click highlight
+        self.move_latencies = deque(maxlen=LATENCY_WINDOW) # Seconds from input to redraw
         self.min_moves = 0 # To store the optimal solution length
+        self.last_peak_nodes = 0 # Peak node count of the last solver run
+        self.heuristic_stats = {} # Heuristic label -> (nodes, seconds) of A* runs on heuristic_stats_state
+        self.heuristic_stats_state = None
+        self.solver_heuristic = None # Heuristic label of the running A* solve
+        self.pending_comparisons = [] # Heuristic labels still to run in a comparison
+
+        # --- Background solver jobs (see _start_solver_job) ---
+        self.solver_results = queue.Queue() # (job_id, kind, state, SolveResult) from worker threads
+        self.solver_job_id = 0
+        self.solver_job_kind = None
+        self.solver_cancel = None # threading.Event of the running job, None when idle
+        self.solver_polling = False
+        self.animation_id = 0 # Bumped on New Game so a running solution animation stops
+
+        # Optimal continuations found by any solve this session; following a hint or a
+        # solution stays on cached states, so the next hint/solve needs no search
+        self.path_cache = puzzle_solver.OptimalPathCache(PATH_CACHE_MAX_STATES)
+
+        # Memory-mapped optimal distances for every 3x3 state (built on first run)
+        self.distance_table = puzzle_table.load_distance_table() if self.size == puzzle_table.TABLE_SIZE else None
         
         # --- History for Undo/Redo ---
-        self.history = deque() # Stores (flat_state_tuple, move_count_at_state)
-        self.future = deque()  # Stores (flat_state_tuple, move_count_at_state)
+        # Move codes since the board was dealt; set to the real start in shuffle_board
+        self.history = puzzle_history.MoveHistory(puzzle_solver.goal_state(self.size), HISTORY_CAP_MOVES)
 
         # --- UI Elements ---
         self.main_frame = tk.Frame(self.root, bg=BG_COLOR, padx=10, pady=10)
@@ -64,6 +161,10 @@ class SlidingPuzzle:
         self.status_label = tk.Label(self.main_frame, text="Click 'New Game' to start!", font=(FONT_FAMILY, FONT_SIZE_LABEL), fg="blue")
         self.status_label.pack(pady=5)
 
+        if self.debug:
+            self.latency_label = tk.Label(self.main_frame, text="Move latency: N/A", font=(FONT_FAMILY, FONT_SIZE_BUTTON - 3), fg="gray", bg=BG_COLOR)
+            self.latency_label.pack(pady=2)
+
         # --- Solver Options and Stats Frame ---
         self.solver_options_frame = tk.LabelFrame(self.main_frame, text="Solver Options & Stats", font=(FONT_FAMILY, FONT_SIZE_BUTTON, "bold"), bg=BG_COLOR, padx=10, pady=5)
         self.solver_options_frame.pack(pady=10, fill="x")
@@ -72,17 +173,57 @@ class SlidingPuzzle:
         tk.Label(self.solver_options_frame, text="Algorithm:", font=(FONT_FAMILY, FONT_SIZE_BUTTON), bg=BG_COLOR).grid(row=0, column=0, padx=5, pady=2, sticky="w")
         self.solver_algorithm = tk.StringVar(self.root)
         self.solver_algorithm.set("A* Search") # default value
-        self.algo_options = ["A* Search", "BFS", "DFS"]
+        self.algo_options = ["A* Search", "ARA* (anytime)", "IDA*", "BFS", "Iterative DFS"]
+        if self.distance_table is not None:
+            self.algo_options.append("Distance Table")
         self.algo_menu = ttk.Combobox(self.solver_options_frame, textvariable=self.solver_algorithm, values=self.algo_options, state="readonly", font=(FONT_FAMILY, FONT_SIZE_BUTTON))
         self.algo_menu.grid(row=0, column=1, padx=5, pady=2, sticky="ew")
         self.algo_menu.bind("<<ComboboxSelected>>", self.on_algo_select) # Event when selection changes
 
+        # Heuristic Selection (A* only); the pattern databases are offered once built for this size
+        tk.Label(self.solver_options_frame, text="Heuristic (A*):", font=(FONT_FAMILY, FONT_SIZE_BUTTON), bg=BG_COLOR).grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.heuristic_options = []
+        for label, name in HEURISTIC_NAMES.items():
+            try:
+                puzzle_solver.get_heuristic(name, self.size) # Walking distance stops at 4x4, PDBs are 4x4 only
+                self.heuristic_options.append(label)
+            except ValueError:
+                pass
+        self.solver_heuristic_var = tk.StringVar(self.root)
+        self.solver_heuristic_var.set(self.heuristic_options[-1] if "Pattern Database" in self.heuristic_options else "Manhattan")
+        self.heuristic_menu = ttk.Combobox(self.solver_options_frame, textvariable=self.solver_heuristic_var, values=self.heuristic_options, state="readonly", font=(FONT_FAMILY, FONT_SIZE_BUTTON))
+        self.heuristic_menu.grid(row=1, column=1, padx=5, pady=2, sticky="ew")
+        self.heuristic_menu.bind("<<ComboboxSelected>>", self.on_algo_select)
+
         # Solver Stats
         self.solver_time_label = tk.Label(self.solver_options_frame, text="Time: N/A", font=(FONT_FAMILY, FONT_SIZE_BUTTON - 2), bg=BG_COLOR)
-        self.solver_time_label.grid(row=1, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+        self.solver_time_label.grid(row=2, column=0, columnspan=2, padx=5, pady=2, sticky="w")
 
         self.solver_nodes_label = tk.Label(self.solver_options_frame, text="Nodes: N/A", font=(FONT_FAMILY, FONT_SIZE_BUTTON - 2), bg=BG_COLOR)
-        self.solver_nodes_label.grid(row=2, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+        self.solver_nodes_label.grid(row=3, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+
+        # Search stats summary (pushes, pops, frontier, closed set, branching factor, memory)
+        self.solver_stats_label = tk.Label(self.solver_options_frame, text="", font=(FONT_FAMILY, FONT_SIZE_BUTTON - 3), bg=BG_COLOR,
+                                           justify="left", wraplength=360)
+        self.solver_stats_label.grid(row=4, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+
+        # Packed int states: A* and BFS key their sets/dicts on ints instead of tuples
+        self.packed_states = tk.BooleanVar(self.root, value=False)
+        tk.Checkbutton(self.solver_options_frame, text="Packed int states (A*, BFS)", variable=self.packed_states,
+                       font=(FONT_FAMILY, FONT_SIZE_BUTTON - 2), bg=BG_COLOR).grid(row=5, column=0, padx=5, pady=2, sticky="w")
+
+        # Trace memory and profile the next solves (slower), profile goes to SOLVE_PROFILE_PATH
+        self.profile_solves = tk.BooleanVar(self.root, value=False)
+        tk.Checkbutton(self.solver_options_frame, text="Trace memory + cProfile", variable=self.profile_solves,
+                       font=(FONT_FAMILY, FONT_SIZE_BUTTON - 2), bg=BG_COLOR).grid(row=5, column=1, padx=5, pady=2, sticky="w")
+
+        # Per-heuristic A* stats on the current board, filled by solves and by "Compare Heuristics"
+        self.compare_button = tk.Button(self.solver_options_frame, text="Compare Heuristics", command=self.compare_heuristics,
+                                        font=(FONT_FAMILY, FONT_SIZE_BUTTON - 2), bg=BUTTON_BG_UNDO_REDO, fg=BUTTON_FG_NORMAL, activebackground="#7E9AAB",
+                                        relief="raised", bd=2)
+        self.compare_button.grid(row=6, column=0, padx=5, pady=2, sticky="w")
+        self.heuristic_stats_label = tk.Label(self.solver_options_frame, text="", font=(FONT_FAMILY, FONT_SIZE_BUTTON - 3), bg=BG_COLOR, justify="left")
+        self.heuristic_stats_label.grid(row=7, column=0, columnspan=2, padx=5, pady=2, sticky="w")
         
         self.solver_options_frame.grid_columnconfigure(1, weight=1) # Allow combobox to expand
 
@@ -104,6 +245,11 @@ class SlidingPuzzle:
                                        font=(FONT_FAMILY, FONT_SIZE_BUTTON), bg=BUTTON_BG_SOLVE, fg=BUTTON_FG_NORMAL, activebackground="#51ADF6",
                                        relief="raised", bd=3)
         self.solve_button.grid(row=0, column=2, padx=5, pady=5)
+
+        self.cancel_button = tk.Button(self.control_frame, text="Cancel", command=self.cancel_solve,
+                                       font=(FONT_FAMILY, FONT_SIZE_BUTTON), bg=BUTTON_BG_UNDO_REDO, fg=BUTTON_FG_NORMAL, activebackground="#7E9AAB",
+                                       relief="raised", bd=3, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=3, padx=5, pady=5)
         
         # --- Undo/Redo Buttons ---
         self.undo_redo_frame = tk.Frame(self.main_frame, bg=BG_COLOR)
@@ -119,6 +265,10 @@ class SlidingPuzzle:
                                      relief="raised", bd=3, state=tk.DISABLED)
         self.redo_button.pack(side=tk.RIGHT, padx=10)
 
+        # Arrow keys queue moves just like clicks
+        for key, move in ARROW_KEY_MOVES.items():
+            self.root.bind(key, lambda e, m=move: self.queue_move(m))
+
         # Initialize the game
         self.shuffle_board()
         self.create_ui()
@@ -129,32 +279,35 @@ class SlidingPuzzle:
         # When algorithm changes, clear previous solver stats
         self.solver_time_label.config(text="Time: N/A", fg="black")
         self.solver_nodes_label.config(text="Nodes: N/A", fg="black")
+        self.solver_stats_label.config(text="")
 
     def get_current_flat_state(self):
         return tuple(num for row in self.tiles for num in row)
 
-    def store_current_state_for_undo(self):
-        # Store the state BEFORE the move
-        self.history.append((self.get_current_flat_state(), self.move_count))
-        # Clear redo history when a new move is made
-        self.future.clear()
+    def record_move(self, move):
+        # Store the move code of the empty tile; this also clears the redo history
+        self.history.record(move)
+        self.log_game("move", move)
         self.update_undo_redo_buttons()
 
+    def log_game(self, event, *args):
+        # Append to the current game's replay log, if logging is on (see puzzle_replay.py)
+        if self.game_log is not None:
+            getattr(self.game_log, event)(*args)
+
     def update_undo_redo_buttons(self):
-        self.undo_button.config(state=tk.NORMAL if self.history else tk.DISABLED)
-        self.redo_button.config(state=tk.NORMAL if self.future else tk.DISABLED)
+        self.undo_button.config(state=tk.NORMAL if self.history.can_undo else tk.DISABLED)
+        self.redo_button.config(state=tk.NORMAL if self.history.can_redo else tk.DISABLED)
 
     def undo_move(self):
-        if not self.history:
+        if not self.history.can_undo:
             return
         
-        # Move current state to future stack
-        self.future.appendleft((self.get_current_flat_state(), self.move_count))
-        
-        # Pop previous state from history
-        prev_state_flat, prev_move_count = self.history.pop()
-        self.tiles = [list(prev_state_flat[i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
-        self.move_count = prev_move_count
+        # Step back by playing the inverse of the last move
+        prev_state_flat = self.history.undo()
+        self.log_game("move", self.history.moves[self.history.position] ^ 1, puzzle_replay.SOURCE_UNDO)
+        self.tiles = [list(prev_state_flat[i*self.size:(i+1)*self.size]) for i in range(self.size)]
+        self.move_count -= 1
         self.update_move_label()
         self.update_ui()
         self.status_label.config(text="Undo!", fg="purple")
@@ -166,16 +319,14 @@ class SlidingPuzzle:
 
 
     def redo_move(self):
-        if not self.future:
+        if not self.history.can_redo:
             return
         
-        # Move current state to history stack
-        self.history.append((self.get_current_flat_state(), self.move_count))
-        
-        # Pop next state from future
-        next_state_flat, next_move_count = self.future.popleft()
-        self.tiles = [list(next_state_flat[i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
-        self.move_count = next_move_count
+        # Replay the next move
+        next_state_flat = self.history.redo()
+        self.log_game("move", self.history.moves[self.history.position - 1], puzzle_replay.SOURCE_REDO)
+        self.tiles = [list(next_state_flat[i*self.size:(i+1)*self.size]) for i in range(self.size)]
+        self.move_count += 1
         self.update_move_label()
         self.update_ui()
         self.status_label.config(text="Redo!", fg="purple")
@@ -187,14 +338,8 @@ class SlidingPuzzle:
 
 
     def shuffle_board(self):
-        while True:
-            nums = list(range(SIZE*SIZE))
-            random.shuffle(nums)
-            self.tiles = [nums[i*SIZE:(i+1)*SIZE] for i in range(SIZE)]
-            
-            flat_tiles = [num for row in self.tiles for num in row]
-            if self.is_solvable(flat_tiles) and not self.is_solved():
-                break
+        nums = puzzle_solver.random_state(self.size) # Always solvable, never already solved
+        self.tiles = [list(nums[i*self.size:(i+1)*self.size]) for i in range(self.size)]
         
         self.move_count = 0
         self.update_move_label()
@@ -203,10 +348,24 @@ class SlidingPuzzle:
         # Reset solver stats
         self.solver_time_label.config(text="Time: N/A", fg="black")
         self.solver_nodes_label.config(text="Nodes: N/A", fg="black")
+        self.solver_stats_label.config(text="")
+        self.heuristic_stats.clear()
+        self.heuristic_stats_state = None
+        self.heuristic_stats_label.config(text="")
 
         # Reset undo/redo history
-        self.history.clear()
-        self.future.clear()
+        self.history.reset(nums)
+
+        # Start a new replay log
+        if self.game_log is not None:
+            self.game_log.close()
+            self.game_log = None
+        if self.log_games:
+            try:
+                self.game_log = puzzle_replay.GameLog(nums)
+            except OSError as e:
+                messagebox.showwarning("Game Logging", f"Game logging disabled: {e}")
+                self.log_games = False
         self.update_undo_redo_buttons()
         
         # Reset solve button state
@@ -219,109 +378,215 @@ class SlidingPuzzle:
 
 
     def create_ui(self):
-        # Clear existing buttons
+        # Clear the existing board
         for row_buttons in self.buttons:
             for btn in row_buttons:
                 btn.destroy()
         self.buttons = []
+        if self.canvas is not None:
+            self.canvas.destroy()
+            self.canvas = None
+        self.canvas_items = {}
+        self.tile_style = {}
+        self.solved = None
+        self.highlighted_cells = set()
+        self.hover_cell = None
+
+        if self.board == "canvas":
+            self._create_canvas_board()
+            return
 
-        for i in range(SIZE):
+        for i in range(self.size):
             row_buttons = []
-            for j in range(SIZE):
-                value = self.tiles[i][j]
-                btn = tk.Button(self.puzzle_frame, text=str(value) if value != 0 else "",
-                                font=(FONT_FAMILY, FONT_SIZE_TILE, "bold"),
+            for j in range(self.size):
+                btn = tk.Button(self.puzzle_frame, text="",
+                                font=(FONT_FAMILY, puzzle_solver.tile_font_size(self.size, FONT_SIZE_TILE), "bold"),
                                 width=3, height=1, # Adjust size to fit 420px width for 3x3
                                 command=lambda r=i, c=j: self.click_tile(r, c),
                                 relief="raised", bd=3)
                 btn.grid(row=i, column=j, padx=2, pady=2, ipadx=5, ipady=5) # Internal padding
                 
-                # Bind hover events
-                btn.bind("<Enter>", lambda e, button=btn: self.on_enter(button))
-                btn.bind("<Leave>", lambda e, button=btn: self.on_leave(button))
+                # Bind hover events; each button knows its own cell, so no lookup is needed
+                btn.bind("<Enter>", lambda e, r=i, c=j: self.on_enter(r, c))
+                btn.bind("<Leave>", lambda e, r=i, c=j: self.on_leave(r, c))
                 
                 row_buttons.append(btn)
             self.buttons.append(row_buttons)
 
-    def update_ui(self, animating_move=None, hint_tile_coords=None):
-        for i in range(SIZE):
-            for j in range(SIZE):
-                val = self.tiles[i][j]
-                btn = self.buttons[i][j]
-                btn.config(text=str(val) if val != 0 else "")
-                
-                # Set base colors
-                if val == 0:
-                    btn.config(bg=EMPTY_TILE_COLOR, state="disabled", fg="black")
-                else:
-                    btn.config(bg=TILE_BG_COLOR, state="normal", fg="black") # Default foreground for numbers
-                
-                # Highlight the tile being animated
-                if animating_move and (i, j) == animating_move:
-                    btn.config(bg=CLICK_COLOR) # Briefly highlight the moving tile
-                
-                # Highlight hint tile
-                if hint_tile_coords and (i, j) == hint_tile_coords:
-                    btn.config(bg=HINT_HIGHLIGHT_COLOR, fg="black") # Make sure number is visible
-
-                # If solved, change all non-empty tiles to a solved color
-                if self.is_solved() and val != 0:
-                    btn.config(bg=SOLVED_COLOR, fg="black")
-
-    def on_enter(self, button):
-        # Only highlight if the button is movable (not empty, and adjacent to empty)
-        r, c = self.find_button_coords(button)
-        if r is not None and c is not None:
-            empty_r, empty_c = self.find_empty()
-            if self.tiles[r][c] != 0 and \
-               ((abs(empty_r - r) == 1 and empty_c == c) or \
-                (abs(empty_c - c) == 1 and empty_r == r)):
-                button.config(bg=HOVER_COLOR)
-
-    def on_leave(self, button):
-        # Reset color when mouse leaves, unless it's the empty tile
-        r, c = self.find_button_coords(button)
-        if r is not None and c is not None:
-            if not self.is_solved() or self.tiles[r][c] == 0: # If not solved or it's the empty tile
-                if self.tiles[r][c] != 0:
-                    button.config(bg=TILE_BG_COLOR)
-                else:
-                    button.config(bg=EMPTY_TILE_COLOR)
-            else: # If solved and it's a number tile
-                button.config(bg=SOLVED_COLOR)
-
-    def find_button_coords(self, target_button):
-        for r_idx, row in enumerate(self.buttons):
-            for c_idx, button in enumerate(row):
-                if button == target_button:
-                    return r_idx, c_idx
-        return None, None
+    def _create_canvas_board(self):
+        # One Canvas with a rectangle and a text item per tile: far fewer widgets than a
+        # grid of Buttons, so big boards lay out and redraw quickly
+        cell = CANVAS_BOARD_PX // self.size
+        self.canvas = tk.Canvas(self.puzzle_frame, width=cell*self.size, height=cell*self.size,
+                                bg=PUZZLE_FRAME_COLOR, highlightthickness=0)
+        self.canvas.pack()
+        for i in range(self.size):
+            for j in range(self.size):
+                rect = self.canvas.create_rectangle(j*cell + 1, i*cell + 1, (j + 1)*cell - 1, (i + 1)*cell - 1,
+                                                    fill=TILE_BG_COLOR, outline=PUZZLE_FRAME_COLOR)
+                text = self.canvas.create_text(j*cell + cell // 2, i*cell + cell // 2, text="",
+                                               font=(FONT_FAMILY, puzzle_solver.tile_font_size(self.size, FONT_SIZE_TILE), "bold"))
+                self.canvas_items[(i, j)] = (rect, text)
+        self.canvas.bind("<Button-1>", self._on_canvas_click)
+        self.canvas.bind("<Motion>", self._on_canvas_motion)
+        self.canvas.bind("<Leave>", lambda e: self._on_canvas_motion(None))
+
+    def _canvas_cell(self, event):
+        cell = CANVAS_BOARD_PX // self.size
+        r, c = event.y // cell, event.x // cell
+        return (r, c) if 0 <= r < self.size and 0 <= c < self.size else None
+
+    def _on_canvas_click(self, event):
+        cell = self._canvas_cell(event)
+        if cell is not None and self.tile_style[cell][2] == "normal": # Same rule as a disabled Button
+            self.click_tile(*cell)
+
+    def _on_canvas_motion(self, event):
+        cell = self._canvas_cell(event) if event is not None else None
+        if cell != self.hover_cell:
+            if self.hover_cell is not None:
+                self.on_leave(*self.hover_cell)
+            if cell is not None:
+                self.on_enter(*cell)
+            self.hover_cell = cell
+
+    def _paint(self, r, c, text=None, bg=None, state=None):
+        # Reconfigure one tile, but only if it would look different: Tk config calls are
+        # what redraws cost, so unchanged tiles are skipped
+        old = self.tile_style.get((r, c), (None, None, None))
+        new = (old[0] if text is None else text, old[1] if bg is None else bg, old[2] if state is None else state)
+        if new == old:
+            return
+        self.tile_style[(r, c)] = new
+        if self.canvas is not None:
+            rect, text_id = self.canvas_items[(r, c)]
+            if new[1] != old[1]:
+                self.canvas.itemconfig(rect, fill=new[1])
+            if new[0] != old[0]:
+                self.canvas.itemconfig(text_id, text=new[0])
+        else:
+            self.buttons[r][c].config(text=new[0], bg=new[1], state=new[2], fg="black")
+
+    def update_ui(self, animating_move=None, hint_tile_coords=None, cells=None):
+        # cells: the tiles a move touched. Only those (and the ones highlighted by the last
+        # redraw) are looked at, unless the solved state flipped and every tile recolours.
+        solved = self.is_solved() # Once per redraw, not once per tile
+        if cells is None or solved != self.solved:
+            cells = [(i, j) for i in range(self.size) for j in range(self.size)]
+        else:
+            cells = set(cells) | self.highlighted_cells
+        self.solved = solved
+        for i, j in cells:
+            val = self.tiles[i][j]
+            
+            # Set base colors
+            if val == 0:
+                self.empty_pos = (i, j)
+                bg, state = EMPTY_TILE_COLOR, "disabled"
+            else:
+                bg, state = TILE_BG_COLOR, "normal"
+            
+            # Highlight the tile being animated
+            if animating_move and (i, j) == animating_move:
+                bg = CLICK_COLOR # Briefly highlight the moving tile
+            
+            # Highlight hint tile
+            if hint_tile_coords and (i, j) == hint_tile_coords:
+                bg = HINT_HIGHLIGHT_COLOR
+
+            # If solved, change all non-empty tiles to a solved color
+            if solved and val != 0:
+                bg = SOLVED_COLOR
+
+            self._paint(i, j, text=str(val) if val != 0 else "", bg=bg, state=state)
+        self.highlighted_cells = {cell for cell in (animating_move, hint_tile_coords) if cell}
+
+    def on_enter(self, r, c):
+        # Only highlight if the tile is movable (not empty, and adjacent to empty)
+        empty_r, empty_c = self.empty_pos
+        if self.tiles[r][c] != 0 and \
+           ((abs(empty_r - r) == 1 and empty_c == c) or \
+            (abs(empty_c - c) == 1 and empty_r == r)):
+            self._paint(r, c, bg=HOVER_COLOR)
+            self.highlighted_cells.add((r, c)) # So the next partial redraw resets it
+
+    def on_leave(self, r, c):
+        # Reset color when mouse leaves
+        self._paint(r, c, bg=self._base_bg(r, c))
+
+    def _base_bg(self, r, c):
+        # Colour of a tile with no highlight on it
+        if self.tiles[r][c] == 0:
+            return EMPTY_TILE_COLOR
+        return SOLVED_COLOR if self.solved else TILE_BG_COLOR
 
     def click_tile(self, row, col):
+        self.queue_move((row, col))
+
+    # --- Move Input Queue ---
+    # Clicks and arrow keys only append to pending_moves; one idle callback then applies
+    # everything queued, so a burst of input is never dropped and nothing sleeps on the
+    # Tk thread. A queued move is checked against the board as it is when its turn comes.
+
+    def queue_move(self, target):
+        self.pending_moves.append((target, time.perf_counter()))
+        if not self.moves_scheduled:
+            self.moves_scheduled = True
+            self.root.after_idle(self._process_moves)
+
+    def _process_moves(self):
+        self.moves_scheduled = False
+        while self.pending_moves:
+            target, queued_at = self.pending_moves.popleft()
+            if isinstance(target, int): # Arrow key: move code of the empty tile
+                dr, dc = puzzle_solver.DIRECTIONS[target]
+                row, col = self.empty_pos[0] + dr, self.empty_pos[1] + dc
+                if not (0 <= row < self.size and 0 <= col < self.size) or self.tile_style[(row, col)][2] != "normal":
+                    continue # Off the board, or tiles are locked (solving, hint, solved)
+            else:
+                row, col = target
+            if self._apply_move(row, col):
+                self.move_latencies.append(time.perf_counter() - queued_at)
+            if self.solved:
+                self.pending_moves.clear()
+        if self.debug and self.move_latencies:
+            latencies = self.move_latencies
+            self.latency_label.config(text=f"Move latency: last {latencies[-1]*1000:.2f} ms, "
+                                           f"avg {sum(latencies)/len(latencies)*1000:.2f} ms, "
+                                           f"max {max(latencies)*1000:.2f} ms ({len(latencies)} moves)")
+
+    def _clear_click_feedback(self):
+        # Only the colour is reset; whether tiles are enabled is left as it is now
+        self.feedback_after_id = None
+        for r, c in self.highlighted_cells:
+            self._paint(r, c, bg=self._base_bg(r, c))
+        self.highlighted_cells.clear()
+
+    def _apply_move(self, row, col):
+        # Slide the tile at (row, col) into the empty cell; False if it isn't next to it
         if self.solve_button["state"] == "disabled" and self.solve_button["text"] == "Solving...":
             # Prevent user interaction during automated solving
-            return
+            return False
 
-        empty_r, empty_c = self.find_empty()
+        empty_r, empty_c = self.empty_pos
         
         is_adjacent = (abs(empty_r - row) == 1 and empty_c == col) or \
                       (abs(empty_c - col) == 1 and empty_r == row)
         
         if is_adjacent:
-            self.store_current_state_for_undo() # Store state BEFORE making the move
+            self.record_move(puzzle_solver.DIRECTIONS.index((row - empty_r, col - empty_c)))
 
-            # Animate click feedback briefly
-            self.buttons[row][col].config(bg=CLICK_COLOR)
-            self.root.update_idletasks() # Force update
-            time.sleep(0.05) # Small delay for visual effect
-
-            # Perform the swap
+            # Perform the swap; only the two tiles involved are redrawn, and the moved
+            # tile stays highlighted until the scheduled callback clears it
             self.tiles[empty_r][empty_c], self.tiles[row][col] = self.tiles[row][col], self.tiles[empty_r][empty_c]
-            self.update_ui()
+            self.update_ui(animating_move=(empty_r, empty_c), cells=[(row, col), (empty_r, empty_c)])
+            if self.feedback_after_id is not None:
+                self.root.after_cancel(self.feedback_after_id)
+            self.feedback_after_id = self.root.after(CLICK_FEEDBACK_MS, self._clear_click_feedback)
             self.move_count += 1
             self.update_move_label()
             
-            if self.is_solved():
+            if self.solved:
                 self.show_victory()
                 self.status_label.config(text=f"Solved in {self.move_count} moves!", fg="green")
                 self.disable_buttons() # Disable interactive tiles after solving
@@ -329,53 +594,49 @@ class SlidingPuzzle:
             else:
                 self.status_label.config(text="Keep going!", fg="blue")
                 self.enable_buttons() # Ensure buttons are enabled after a move if not solved
+        return is_adjacent
 
     def find_empty(self, tiles=None):
         if tiles is None:
             tiles = self.tiles
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 if tiles[i][j] == 0:
                     return i, j
 
     def is_solved(self, tiles=None):
         if tiles is None:
             tiles = self.tiles
-        goal = list(range(1, SIZE*SIZE)) + [0]
+        goal = list(range(1, self.size*self.size)) + [0]
         flat = [num for row in tiles for num in row]
         return flat == goal
 
     def is_solvable(self, flat):
-        # For an N x N puzzle, solvability depends on N and inversion count
-        # For N=3 (our 8-puzzle), it's solvable if inversion count is even.
-        inv_count = 0
-        for i in range(len(flat)):
-            for j in range(i + 1, len(flat)):
-                # Count inversions only for non-zero numbers
-                if flat[i] != 0 and flat[j] != 0 and flat[i] > flat[j]:
-                    inv_count += 1
-        
-        # For an N x N puzzle:
-        # If N is odd, puzzle is solvable if inversion count is even.
-        # If N is even:
-        #   - If empty tile is on an even row counting from bottom (0,2,4..), solvable if inv_count is odd.
-        #   - If empty tile is on an odd row counting from bottom (1,3,5..), solvable if inv_count is even.
-        # For 8-puzzle (N=3, odd):
-        return inv_count % 2 == 0
+        return puzzle_solver.is_solvable(flat)
 
     def show_victory(self):
-        # Briefly flash solved tiles
-        for i in range(SIZE):
-            for j in range(SIZE):
+        # Briefly flash solved tiles, then settle on SOLVED_COLOR and announce the win
+        self.log_game("solved")
+        for i in range(self.size):
+            for j in range(self.size):
                 if self.tiles[i][j] != 0:
-                    self.buttons[i][j].config(bg="#90ee90") # Lighter green
-        self.root.update_idletasks()
-        time.sleep(0.2)
-        self.update_ui() # Reset to SOLVED_COLOR
-
+                    self._paint(i, j, bg="#90ee90") # Lighter green
+        self.root.after(VICTORY_FLASH_MS, self._finish_victory, self.animation_id)
+
+    def _finish_victory(self, animation_id):
+        if animation_id != self.animation_id:
+            return # New Game was pressed during the flash
+        for i in range(self.size):
+            for j in range(self.size):
+                if self.tiles[i][j] != 0:
+                    self._paint(i, j, bg=SOLVED_COLOR)
+        self.highlighted_cells.clear()
         messagebox.showinfo("You Win!", f"🎉 Puzzle Solved in {self.move_count} moves!")
 
     def reset_game(self):
+        self._abandon_solver_job() # Don't wait for a solve of the old board
+        self.animation_id += 1
+        self.pending_moves.clear() # Input meant for the old board
         self.shuffle_board()
         self.create_ui() # Re-create buttons to reset bindings and state
         self.update_ui()
@@ -387,26 +648,26 @@ class SlidingPuzzle:
         self.move_label.config(text=f"Moves: {self.move_count}")
 
     def disable_buttons(self):
-        for row in self.buttons:
-            for btn in row:
-                btn.config(state="disabled")
+        for i in range(self.size):
+            for j in range(self.size):
+                self._paint(i, j, state="disabled")
         self.new_game_button.config(state="disabled")
         self.solve_button.config(state="disabled")
         self.hint_button.config(state="disabled")
         self.undo_button.config(state="disabled")
         self.redo_button.config(state="disabled")
+        self.compare_button.config(state="disabled") # Starting a comparison would cancel the running job
 
     def enable_buttons(self):
         # Re-enable puzzle tiles if they are not the empty one
-        for i in range(SIZE):
-            for j in range(SIZE):
-                if self.tiles[i][j] != 0:
-                    self.buttons[i][j].config(state="normal")
-                else:
-                    self.buttons[i][j].config(state="disabled") # Empty tile stays disabled
+        for i in range(self.size):
+            for j in range(self.size):
+                # Empty tile stays disabled
+                self._paint(i, j, state="normal" if self.tiles[i][j] != 0 else "disabled")
         self.new_game_button.config(state="normal")
         self.solve_button.config(state="normal")
         self.hint_button.config(state="normal")
+        self.compare_button.config(state="normal")
         self.update_undo_redo_buttons() # Update state based on history/future
 
     # --- Hint System ---
@@ -418,25 +679,31 @@ class SlidingPuzzle:
         self.status_label.config(text="Getting hint...", fg="orange")
         self.disable_buttons() # Disable during hint calculation
 
-        # Calculate the next optimal move using A*
         current_state_flat = self.get_current_flat_state()
-        hint_path = self._a_star_solver_core(current_state_flat)
+        cached_path = self.path_cache.get(current_state_flat)
+        if cached_path is not None:
+            self._show_hint(current_state_flat, cached_path)
+        elif self.distance_table is not None:
+            # Instant lookup on 3x3 boards
+            self._show_hint(current_state_flat, self.distance_table.optimal_path(current_state_flat))
+        else:
+            self._start_solver_job("hint", current_state_flat, "astar", cache=self.path_cache,
+                                   time_limit=HINT_TIME_LIMIT_S, max_memory_mb=SOLVER_MEMORY_CAP_MB)
+            self.new_game_button.config(state="normal")
+            self.cancel_button.config(state="normal")
 
-        if hint_path and len(hint_path) > 1:
+    def _show_hint(self, current_state_flat, hint_path):
+        if hint_path and len(hint_path) > 1 and current_state_flat == self.get_current_flat_state():
             next_state_flat = hint_path[1] # The state after the first optimal move
             
-            # Find which tile moved to reach next_state_flat
-            current_empty_pos = current_state_flat.index(0)
+            # The tile to click is the one standing where the empty tile goes next
             next_empty_pos = next_state_flat.index(0)
-            
-            # The tile that moved is the one currently at next_empty_pos
-            # but was previously at current_empty_pos
-            moved_tile_value = current_state_flat[next_empty_pos]
-            moved_tile_coords = divmod(next_empty_pos, SIZE) # Row, Col of the tile to click
+            moved_tile_coords = divmod(next_empty_pos, self.size) # Row, Col of the tile to click
 
             # Temporarily highlight the hint tile
             self.update_ui(hint_tile_coords=moved_tile_coords)
             self.root.after(HINT_FLASH_DELAY_MS, self.reset_hint_highlight)
+            self.log_game("hint")
             self.status_label.config(text="Here's a hint!", fg="darkgreen")
         else:
             self.status_label.config(text="No hint found (puzzle might be solved or error).", fg="red")
@@ -449,29 +716,36 @@ class SlidingPuzzle:
     # --- Algorithm Solvers ---
 
     def calculate_min_moves_async(self):
-        self.status_label.config(text="Calculating optimal moves...", fg="orange")
-        self.root.update_idletasks() # Update GUI immediately
-
-        # Run A* solver to find the path length
-        # This will run in the main thread but with a slight delay
-        self.root.after(100, self._calculate_min_moves_internal)
-
-    def _calculate_min_moves_internal(self):
-        start_time = time.time()
         initial_flat_state = self.get_current_flat_state()
-        
-        # Use A* for minimal moves calculation
-        path = self._a_star_solver_core(initial_flat_state, return_path_only_length=True)
-        
-        if path is not None:
-            self.min_moves = len(path) - 1 # Exclude initial state
+        if self.distance_table is not None:
+            # Table lookup for 3x3, no search needed
+            self._on_min_moves_result(puzzle_solver.solve(initial_flat_state, "table", cache=self.path_cache))
+            return
+        self.status_label.config(text="Calculating optimal moves...", fg="orange")
+        self._start_solver_job("min_moves", initial_flat_state, "astar", cache=self.path_cache,
+                               time_limit=MIN_MOVES_TIME_LIMIT_S, max_memory_mb=SOLVER_MEMORY_CAP_MB)
+
+    def _on_min_moves_result(self, result):
+        if result.solved and result.status != "solved":
+            # Budget ran out: show the best known path length and how far off it may be
+            self.min_moves = result.length
+            self.min_moves_label.config(text=f"Optimal Moves: ≤ {result.length} (within {result.suboptimality:.2f}x)", fg="darkorange")
+        elif result.solved:
+            self.min_moves = result.length
             self.min_moves_label.config(text=f"Optimal Moves: {self.min_moves}", fg="darkgreen")
-        else:
+            self.log_game("min_moves", self.min_moves)
+        elif result.status == "cancelled":
+            self.min_moves_label.config(text="Optimal Moves: Not calculated", fg="gray")
+        elif result.status in STOP_REASON_TEXT:
+            # Budget ran out and the quick fallback found no path either (big boards)
+            self.min_moves_label.config(text=f"Optimal Moves: Unknown ({STOP_REASON_TEXT[result.status]})", fg="darkorange")
+        elif result.status == "unsolvable":
             self.min_moves_label.config(text="Optimal Moves: Not solvable", fg="red")
             messagebox.showerror("Error", "The current puzzle state is not solvable. This shouldn't happen with the shuffling logic.")
+        else:
+            self.min_moves_label.config(text="Optimal Moves: Not found", fg="gray")
 
         self.status_label.config(text="Ready to play!", fg="blue")
-        # print(f"Optimal moves calculation time: {time.time() - start_time:.2f} seconds")
 
     def solve_puzzle_gui_wrapper(self):
         if self.is_solved():
@@ -480,178 +754,208 @@ class SlidingPuzzle:
 
         self.disable_buttons() # Disable user interaction
         self.solve_button.config(state="disabled", text="Solving...")
-        self.new_game_button.config(state="disabled")
-        self.hint_button.config(state="disabled")
-        self.undo_button.config(state="disabled")
-        self.redo_button.config(state="disabled")
+        self.new_game_button.config(state="normal") # New Game abandons the running solve
+        self.cancel_button.config(state="normal")
         
         self.status_label.config(text=f"Solving using {self.solver_algorithm.get()}...", fg="red")
         self.solver_time_label.config(text="Time: Calculating...", fg="orange")
         self.solver_nodes_label.config(text="Nodes: Calculating...", fg="orange")
-        self.root.update_idletasks() # Force GUI update
-
-        initial_flat_state = self.get_current_flat_state()
-        
-        # Using a slightly delayed call to allow GUI to update "Solving..."
-        self.root.after(100, lambda: self._start_solving_animation(initial_flat_state))
-
-    def _start_solving_animation(self, initial_flat_state):
-        selected_algo = self.solver_algorithm.get()
-        path = None
-        nodes_explored = 0
-        start_time = time.time()
-
-        if selected_algo == "A* Search":
-            path, nodes_explored = self._a_star_solver_core(initial_flat_state, return_nodes_explored=True)
-        elif selected_algo == "BFS":
-            path, nodes_explored = self._bfs_solver_core(initial_flat_state)
-        elif selected_algo == "DFS":
-            path, nodes_explored = self._dfs_solver_core(initial_flat_state)
-        
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-
-        self.solver_time_label.config(text=f"Time: {elapsed_time:.3f}s", fg="black")
-        self.solver_nodes_label.config(text=f"Nodes: {nodes_explored}", fg="black")
-
 
-        if path is None:
-            messagebox.showinfo("No Solution", "No solution found!")
+        options = {"cache": self.path_cache}
+        algorithm = ALGORITHM_NAMES[self.solver_algorithm.get()]
+        if self.packed_states.get() and algorithm in ("astar", "bfs"):
+            options["encoding"] = "packed"
+        if self.profile_solves.get():
+            # Always run the real search when it is being measured, never the cached path
+            options.update(cache=None, trace_memory=True, profile=SOLVE_PROFILE_PATH)
+        self.solver_heuristic = None
+        if algorithm == "astar":
+            self.solver_heuristic = self.solver_heuristic_var.get()
+            options["heuristic"] = HEURISTIC_NAMES[self.solver_heuristic]
+        time_limit = SOLVE_TIME_LIMIT_S
+        if algorithm == "arastar":
+            # Each better path shows up in the status line; Cancel keeps the best one so far
+            options.update(heuristic=HEURISTIC_NAMES[self.solver_heuristic_var.get()], progress=True)
+            time_limit = ANYTIME_TIME_LIMIT_S
+        self._start_solver_job("solve", self.get_current_flat_state(), algorithm,
+                               time_limit=time_limit, max_memory_mb=SOLVER_MEMORY_CAP_MB, **options)
+
+    def cancel_solve(self):
+        # The worker notices within ~1000 nodes and reports back as "cancelled"
+        if self.solver_cancel is not None:
+            self.solver_cancel.set()
+            self.cancel_button.config(state="disabled")
+            self.status_label.config(text="Cancelling...", fg="orange")
+
+    def _on_solve_result(self, state, result):
+        self.cancel_button.config(state="disabled")
+        self.log_game("solve", result)
+        self.last_peak_nodes = result.peak_nodes
+        if self.solver_heuristic is not None:
+            self._record_heuristic_stats(state, self.solver_heuristic, result)
+        self.solver_time_label.config(text=f"Time: {result.elapsed:.3f}s ({result.nodes_per_second:,.0f} nodes/s)", fg="black")
+        nodes_text = f"Nodes: {result.nodes_explored} (peak stored: {result.peak_nodes})"
+        if result.from_cache:
+            nodes_text = "Nodes: 0 (optimal path cached this session)"
+        if result.status in STOP_REASON_TEXT or (result.status == "cancelled" and result.solved):
+            nodes_text += f" - {STOP_REASON_TEXT.get(result.status, 'Stopped early')}"
+            if result.solved:
+                nodes_text += f", path within {result.suboptimality:.2f}x of optimal"
+        self.solver_nodes_label.config(text=nodes_text, fg="darkorange" if result.status in STOP_REASON_TEXT else "black")
+        stats_text = "" if result.from_cache else result.stats.summary()
+        if stats_text and self.profile_solves.get():
+            stats_text += f"\nProfile written to {os.path.basename(SOLVE_PROFILE_PATH)}"
+        self.solver_stats_label.config(text=stats_text)
+
+        if not result.solved:
+            if result.status == "cancelled":
+                self.status_label.config(text="Solve cancelled.", fg="purple")
+            else:
+                messagebox.showinfo("No Solution", "No solution found!")
+                self.status_label.config(text="No solution found!", fg="red")
             self.solve_button.config(state="normal", text="Solve")
-            self.new_game_button.config(state="normal")
-            self.hint_button.config(state="normal")
             self.enable_buttons() # Re-enable user buttons if no solution
-            self.status_label.config(text="No solution found!", fg="red")
             return
 
-        # Clear undo/redo history before animating a solution
-        self.history.clear()
-        self.future.clear()
-        self.update_undo_redo_buttons()
-
-        self.animate_solution(path)
-
-    # --- Core A* Solver ---
-    def _a_star_solver_core(self, start_state, return_path_only_length=False, return_nodes_explored=False):
-        goal = tuple(list(range(1, SIZE*SIZE)) + [0])
-        
-        def manhattan(state_tuple):
-            dist = 0
-            for idx, val in enumerate(state_tuple):
-                if val == 0: continue
-                target_r, target_c = divmod(val - 1, SIZE)
-                current_r, current_c = divmod(idx, SIZE)
-                dist += abs(target_r - current_r) + abs(target_c - current_c)
-            return dist
-
-        open_set = [] # Min-heap of (f_score, g_score, state_tuple, path_list)
-        heapq.heappush(open_set, (manhattan(start_state), 0, start_state, [start_state]))
-        
-        closed_set = set() # Use a set for faster lookups
-        g_scores = {start_state: 0} # Stores the g_score (cost from start) for a state
-        nodes_explored = 0
+        if result.status == "cancelled": # An anytime solve stopped early keeps its best path
+            self.status_label.config(text=f"Playing the best path found ({result.length} moves)", fg="purple")
 
-        while open_set:
-            f, g, current_state, current_path = heapq.heappop(open_set)
-            nodes_explored += 1
-
-            if current_state == goal:
-                if return_path_only_length: return current_path # Return the path (list of states)
-                if return_nodes_explored: return current_path, nodes_explored
-                return current_path
+        # The solution replaces the undo/redo history, so it can be stepped back through
+        self.history.reset(state)
+        self.update_undo_redo_buttons()
 
-            if current_state in closed_set:
-                continue
-            closed_set.add(current_state)
+        self.animate_solution(result.moves)
 
-            for neighbor in self._get_neighbors(current_state):
-                if neighbor in closed_set:
-                    continue
+    def _on_solve_progress(self, length, bound):
+        # Best path so far from an anytime solve; bound 1.00 means it is optimal
+        self.status_label.config(text=f"Moves ≤ {length} (bound {bound:.2f})", fg="darkgreen" if bound <= 1 else "darkorange")
 
-                new_g = g + 1
+    # --- Heuristic Comparison ---
+    # Runs A* once per heuristic on the current board, one background job after another,
+    # without touching the board, and lists nodes and time for each in the stats frame.
 
-                if new_g < g_scores.get(neighbor, float('inf')):
-                    g_scores[neighbor] = new_g
-                    new_f = new_g + manhattan(neighbor)
-                    heapq.heappush(open_set, (new_f, new_g, neighbor, current_path + [neighbor]))
-        
-        if return_nodes_explored: return None, nodes_explored
-        return None
-
-    # --- Core BFS Solver ---
-    def _bfs_solver_core(self, start_state):
-        goal = tuple(list(range(1, SIZE*SIZE)) + [0])
-        queue = deque([(start_state, [start_state])]) # (state, path)
-        visited = {start_state}
-        nodes_explored = 0
-
-        while queue:
-            current_state, path = queue.popleft()
-            nodes_explored += 1
-
-            if current_state == goal:
-                return path, nodes_explored
-
-            for neighbor in self._get_neighbors(current_state):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
-        return None, nodes_explored
-
-    # --- Core DFS Solver ---
-    def _dfs_solver_core(self, start_state, max_depth=50): # Add a max_depth to prevent infinite recursion/long runs
-        goal = tuple(list(range(1, SIZE*SIZE)) + [0])
-        stack = [(start_state, [start_state], 0)] # (state, path, depth)
-        visited = set() # To track visited states in the current path to avoid cycles
-        
-        # We need to manage visited states carefully for DFS to find *any* path without loops.
-        # For finding a solution and not getting stuck, it's often better to re-initialize visited
-        # for each branch, or use iterative deepening DFS for optimal path.
-        # For simplicity, this visited set prevents re-exploring states if found during search.
-        nodes_explored = 0
-
-        while stack:
-            current_state, path, depth = stack.pop()
-            nodes_explored += 1
-
-            if current_state == goal:
-                return path, nodes_explored
-            
-            if current_state in visited:
+    def compare_heuristics(self):
+        state = self.get_current_flat_state()
+        if self.is_solved():
+            messagebox.showinfo("Solved", "The puzzle is already solved!")
+            return
+        self.compare_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.pending_comparisons = list(self.heuristic_options)
+        self._run_next_comparison(state)
+
+    def _run_next_comparison(self, state):
+        label = self.pending_comparisons.pop(0)
+        self.status_label.config(text=f"Comparing heuristics: {label}...", fg="red")
+        options = {"encoding": "packed"} if self.packed_states.get() else {}
+        self._start_solver_job("compare", state, "astar", heuristic=HEURISTIC_NAMES[label],
+                               time_limit=SOLVE_TIME_LIMIT_S, max_memory_mb=SOLVER_MEMORY_CAP_MB, **options)
+        self.solver_heuristic = label
+
+    def _on_compare_result(self, state, result):
+        self._record_heuristic_stats(state, self.solver_heuristic, result)
+        if self.pending_comparisons and result.status != "cancelled":
+            self._run_next_comparison(state)
+            return
+        self.pending_comparisons = []
+        self.compare_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.status_label.config(text="Heuristic comparison done." if result.status != "cancelled" else "Comparison cancelled.",
+                                 fg="blue" if result.status != "cancelled" else "purple")
+
+    def _record_heuristic_stats(self, state, label, result):
+        if state != self.heuristic_stats_state: # Stats only compare runs on the same board
+            self.heuristic_stats.clear()
+            self.heuristic_stats_state = state
+        if result.status == "solved":
+            self.heuristic_stats[label] = f"{result.nodes_explored:,} nodes, {result.elapsed:.3f}s"
+        else:
+            self.heuristic_stats[label] = f"stopped ({result.status}) after {result.nodes_explored:,} nodes"
+        lines = [f"{name}: {self.heuristic_stats[name]}" for name in self.heuristic_options if name in self.heuristic_stats]
+        self.heuristic_stats_label.config(text="\n".join(lines))
+
+    # --- Background Solver Jobs ---
+    # Searches run in a daemon worker thread so the Tk event loop never blocks. The worker
+    # only calls puzzle_solver.solve() and puts the result on a queue, which the Tk thread
+    # polls with after(); widgets are only ever touched from the Tk thread. Starting a new
+    # job cancels the previous one and bumps the job id, so its late result is dropped.
+    # With progress=True (ARA*), every better path found on the way is queued too.
+
+    def _start_solver_job(self, kind, state, algorithm, progress=False, **options):
+        self._abandon_solver_job()
+        self.solver_job_id += 1
+        self.solver_job_kind = kind
+        job_id = self.solver_job_id
+        cancel = threading.Event()
+        self.solver_cancel = cancel
+        if progress:
+            options["on_solution"] = lambda path, bound: self.solver_results.put((job_id, "progress", state, (len(path) - 1, bound)))
+
+        def work():
+            result = puzzle_solver.solve(state, algorithm, cancel=cancel, **options)
+            self.solver_results.put((job_id, kind, state, result))
+
+        threading.Thread(target=work, daemon=True).start()
+        if not self.solver_polling:
+            self.solver_polling = True
+            self.root.after(SOLVER_POLL_MS, self._poll_solver_results)
+
+    def _abandon_solver_job(self):
+        if self.solver_cancel is None:
+            return
+        self.solver_cancel.set()
+        self.solver_cancel = None
+        self.solver_job_id += 1 # Its result, if one still arrives, is dropped
+        if self.solver_job_kind == "min_moves":
+            self.min_moves_label.config(text="Optimal Moves: Not calculated", fg="gray")
+        elif self.solver_job_kind == "compare":
+            self.pending_comparisons = []
+            self.compare_button.config(state="normal")
+        elif self.solver_job_kind in ("solve", "hint"):
+            # The board was locked for this job; unlock it, or no move would be accepted
+            self.solve_button.config(text="Solve")
+            self.enable_buttons()
+        self.cancel_button.config(state="disabled")
+
+    def _poll_solver_results(self):
+        while True:
+            try:
+                job_id, kind, state, result = self.solver_results.get_nowait()
+            except queue.Empty:
+                break
+            if job_id != self.solver_job_id:
+                continue # Abandoned by a newer job
+            if kind == "progress": # The job is still running
+                self._on_solve_progress(*result)
                 continue
-            visited.add(current_state) # Mark as visited for this DFS run
+            self.solver_cancel = None
+            if kind == "min_moves":
+                self._on_min_moves_result(result)
+            elif kind == "solve":
+                self._on_solve_result(state, result)
+            elif kind == "compare":
+                self._on_compare_result(state, result)
+            elif kind == "hint":
+                self._show_hint(state, result.path)
+
+        if self.solver_cancel is not None: # A job is still running
+            self.root.after(SOLVER_POLL_MS, self._poll_solver_results)
+        else:
+            self.solver_polling = False
 
-            if depth < max_depth: # Depth limit to prevent extremely long runs/recursion errors
-                # Get neighbors and push them onto the stack (in reverse order for natural LIFO)
-                for neighbor in reversed(self._get_neighbors(current_state)):
-                    if neighbor not in visited: # Only explore if not already visited in this path
-                        stack.append((neighbor, path + [neighbor], depth + 1))
-        
-        return None, nodes_explored
-
-    def _get_neighbors(self, state_tuple):
-        zero_pos = state_tuple.index(0)
-        neighbors = []
-        r, c = divmod(zero_pos, SIZE)
-        directions = [(-1,0),(1,0),(0,-1),(0,1)] # Up, Down, Left, Right
-        for dr, dc in directions:
-            nr, nc = r+dr, c+dc
-            if 0 <= nr < SIZE and 0 <= nc < SIZE:
-                new_pos = nr*SIZE + nc
-                new_state_list = list(state_tuple)
-                new_state_list[zero_pos], new_state_list[new_pos] = new_state_list[new_pos], new_state_list[zero_pos]
-                neighbors.append(tuple(new_state_list))
-        return neighbors
-
-    def animate_solution(self, path):
-        # path includes the initial state, so actual moves = len(path) - 1
+    def animate_solution(self, moves):
+        # moves: move string of the empty tile ("ULDR..."). Each step is applied to the
+        # board and recorded in the history, one byte per move, so no list of states is kept.
+        codes = [puzzle_solver.MOVE_NAMES.index(name) for name in moves]
         self.move_count = 0
         self.update_move_label()
+        animation_id = self.animation_id
         
         def step(index):
-            if index >= len(path):
+            if animation_id != self.animation_id:
+                return # A new game was started mid-animation
+            if index >= len(codes):
                 # Animation finished
-                self.tiles = [list(path[-1][i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
                 self.update_ui() # Final update
                 self.show_victory() # Show victory message and handle game end
                 
@@ -659,35 +963,37 @@ class SlidingPuzzle:
                 self.solve_button.config(state="disabled", text="Solve") 
                 self.new_game_button.config(state="normal")
                 self.hint_button.config(state="disabled") # No hints after solved
+                self.compare_button.config(state="normal")
                 self.update_undo_redo_buttons() # Re-enable undo/redo if applicable
                 
                 self.status_label.config(text=f"Solved in {self.move_count} moves!", fg="green")
                 return
 
-            current_flat_state = path[index]
-            prev_flat_state = path[index - 1] if index > 0 else None
-
-            # Determine which tile moved for visual highlight
-            moved_tile_coords = None
-            if prev_flat_state:
-                prev_empty_idx = prev_flat_state.index(0)
-                current_empty_idx = current_flat_state.index(0)
-                # The tile that moved is the one that's now in the empty tile's previous position
-                # Its value is current_flat_state[prev_empty_idx]
-                # Its coordinates in the new state are determined by prev_empty_idx
-                moved_tile_coords = divmod(prev_empty_idx, SIZE) # (row, col)
-
-            self.tiles = [list(current_flat_state[i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
-            self.update_ui(animating_move=moved_tile_coords)
-            
-            # Only increment move count for actual moves, not initial state
-            if index > 0: 
-                self.move_count = index 
-                self.update_move_label()
+            # The tile that moved ends up where the empty tile was
+            empty_r, empty_c = self.empty_pos
+            dr, dc = puzzle_solver.DIRECTIONS[codes[index]]
+            row, col = empty_r + dr, empty_c + dc
+            self.tiles[empty_r][empty_c], self.tiles[row][col] = self.tiles[row][col], 0
+            self.history.record(codes[index])
+            self.log_game("move", codes[index], puzzle_replay.SOURCE_SOLVER)
+            # Each step only swaps the moved tile and the empty tile
+            self.update_ui(animating_move=(empty_r, empty_c), cells=[(row, col), (empty_r, empty_c)])
+            self.move_count = index + 1
+            self.update_move_label()
 
             self.root.after(ANIMATION_DELAY_MS, step, index + 1)
 
+        self.root.after(ANIMATION_DELAY_MS, step, 0) # First move after one frame of the start board
+
 if __name__ == "__main__":
+    # python new.py [size] [buttons|canvas] [--debug] [--no-log], e.g. python new.py 4 for the 15-puzzle
+    args = [arg for arg in sys.argv[1:] if arg not in ("--debug", "--no-log")]
+    size = int(args[0]) if args else SIZE
+    if not 2 <= size <= puzzle_solver.MAX_SIZE:
+        sys.exit(f"size must be between 2 and {puzzle_solver.MAX_SIZE}")
+    board = args[1] if len(args) > 1 else None
+    if board not in (None, "buttons", "canvas"):
+        sys.exit("board must be 'buttons' or 'canvas'")
     root = tk.Tk()
-    game = SlidingPuzzle(root)
+    game = SlidingPuzzle(root, size, board, debug="--debug" in sys.argv, log_games="--no-log" not in sys.argv)
     root.mainloop()
\ No newline at end of file
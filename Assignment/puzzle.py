@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox
-import random
-import heapq
+import sys
 import time
 
+import puzzle_solver
+
 SIZE = 3
 
 # --- UI Constants ---
@@ -16,12 +17,20 @@ FONT_FAMILY = "Arial"
 FONT_SIZE_TILE = 24
 FONT_SIZE_LABEL = 14
 ANIMATION_DELAY_MS = 200 # Milliseconds for solution animation step
+MAX_MIN_MOVES_SIZE = 3 # The optimal-moves A* runs on the Tk thread, so skip it on bigger boards
+
+# Search budgets for puzzle_solver; past these the solver returns its best path so far
+MIN_MOVES_TIME_LIMIT_S = 5
+SOLVE_TIME_LIMIT_S = 10
+SOLVER_MEMORY_CAP_MB = 512
 
 class SlidingPuzzle:
-    def __init__(self, root):
+    def __init__(self, root, size=SIZE):
         self.root = root
-        self.root.title("Sliding Puzzle - 8 Puzzle")
-        self.root.geometry("400x550") # Set initial window size
+        self.size = size # Board is size x size, from 2 up to puzzle_solver.MAX_SIZE
+        self.root.title(f"Sliding Puzzle - {size*size - 1} Puzzle")
+        if size == SIZE:
+            self.root.geometry("400x550") # Set initial window size
         self.root.resizable(False, False) # Disable resizing for simplicity
 
         self.tiles = []
@@ -66,14 +75,8 @@ class SlidingPuzzle:
         self.calculate_min_moves_async() # Calculate optimal moves in background
 
     def shuffle_board(self):
-        while True:
-            nums = list(range(SIZE*SIZE))
-            random.shuffle(nums)
-            self.tiles = [nums[i*SIZE:(i+1)*SIZE] for i in range(SIZE)]
-            # Check solvability after shuffling
-            flat_tiles = [num for row in self.tiles for num in row]
-            if self.is_solvable(flat_tiles) and not self.is_solved():
-                break
+        nums = puzzle_solver.random_state(self.size) # Always solvable, never already solved
+        self.tiles = [list(nums[i*self.size:(i+1)*self.size]) for i in range(self.size)]
         self.move_count = 0
         self.update_move_label()
         self.status_label.config(text="Ready to play!", fg="blue")
@@ -90,27 +93,28 @@ class SlidingPuzzle:
                 btn.destroy()
         self.buttons = []
 
-        for i in range(SIZE):
+        for i in range(self.size):
             row_buttons = []
-            for j in range(SIZE):
+            for j in range(self.size):
                 value = self.tiles[i][j]
                 btn = tk.Button(self.puzzle_frame, text=str(value) if value != 0 else "",
-                                font=(FONT_FAMILY, FONT_SIZE_TILE, "bold"),
+                                font=(FONT_FAMILY, puzzle_solver.tile_font_size(self.size, FONT_SIZE_TILE), "bold"),
                                 width=4, height=2,
                                 command=lambda r=i, c=j: self.click_tile(r, c),
                                 relief="raised", bd=3)
                 btn.grid(row=i, column=j, padx=2, pady=2)
                 
-                # Bind hover events
-                btn.bind("<Enter>", lambda e, button=btn: self.on_enter(button))
-                btn.bind("<Leave>", lambda e, button=btn: self.on_leave(button))
+                # Bind hover events; each button knows its own cell, so no lookup is needed
+                btn.bind("<Enter>", lambda e, r=i, c=j: self.on_enter(r, c))
+                btn.bind("<Leave>", lambda e, r=i, c=j: self.on_leave(r, c))
                 
                 row_buttons.append(btn)
             self.buttons.append(row_buttons)
 
     def update_ui(self, animating_move=None):
-        for i in range(SIZE):
-            for j in range(SIZE):
+        solved = self.is_solved() # Once per redraw, not once per tile
+        for i in range(self.size):
+            for j in range(self.size):
                 val = self.tiles[i][j]
                 btn = self.buttons[i][j]
                 btn.config(text=str(val) if val != 0 else "")
@@ -126,32 +130,21 @@ class SlidingPuzzle:
                     btn.config(bg=CLICK_COLOR) # Briefly highlight the moving tile
                 
                 # If solved, change all non-empty tiles to a solved color
-                if self.is_solved() and val != 0:
+                if solved and val != 0:
                     btn.config(bg=SOLVED_COLOR, fg="black") # Use a black foreground for solved tiles
 
-    def on_enter(self, button):
+    def on_enter(self, r, c):
         # Only highlight if the button is movable (not empty, and adjacent to empty)
-        r, c = self.find_button_coords(button)
-        if r is not None and c is not None:
-            empty_r, empty_c = self.find_empty()
-            if (abs(empty_r - r) == 1 and empty_c == c) or (abs(empty_c - c) == 1 and empty_r == r):
-                button.config(bg=HOVER_COLOR)
+        empty_r, empty_c = self.find_empty()
+        if (abs(empty_r - r) == 1 and empty_c == c) or (abs(empty_c - c) == 1 and empty_r == r):
+            self.buttons[r][c].config(bg=HOVER_COLOR)
 
-    def on_leave(self, button):
+    def on_leave(self, r, c):
         # Reset color when mouse leaves, unless it's the empty tile
-        r, c = self.find_button_coords(button)
-        if r is not None and c is not None:
-            if self.tiles[r][c] != 0:
-                button.config(bg=TILE_BG_COLOR)
-            else:
-                button.config(bg=EMPTY_TILE_COLOR)
-
-    def find_button_coords(self, target_button):
-        for r_idx, row in enumerate(self.buttons):
-            for c_idx, button in enumerate(row):
-                if button == target_button:
-                    return r_idx, c_idx
-        return None, None # Should not happen
+        if self.tiles[r][c] != 0:
+            self.buttons[r][c].config(bg=TILE_BG_COLOR)
+        else:
+            self.buttons[r][c].config(bg=EMPTY_TILE_COLOR)
 
     def click_tile(self, row, col):
         empty_r, empty_c = self.find_empty()
@@ -182,33 +175,26 @@ class SlidingPuzzle:
     def find_empty(self, tiles=None):
         if tiles is None:
             tiles = self.tiles
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 if tiles[i][j] == 0:
                     return i, j
 
     def is_solved(self, tiles=None):
         if tiles is None:
             tiles = self.tiles
-        goal = list(range(1, SIZE*SIZE)) + [0]
+        goal = list(range(1, self.size*self.size)) + [0]
         flat = [num for row in tiles for num in row]
         return flat == goal
 
     def is_solvable(self, flat):
-        inv_count = 0
-        for i in range(len(flat)):
-            for j in range(i+1, len(flat)):
-                if flat[i] != 0 and flat[j] != 0 and flat[i] > flat[j]:
-                    inv_count += 1
-        
-        # For an N x N puzzle, solvability depends on N and inversion count
-        # For N=3 (our 8-puzzle), it's solvable if inversion count is even.
-        return inv_count % 2 == 0
+        # Inversion parity, plus the blank's row on even-width boards
+        return puzzle_solver.is_solvable(flat)
 
     def show_victory(self):
         # Briefly flash solved tiles
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 if self.tiles[i][j] != 0:
                     self.buttons[i][j].config(bg="#90ee90") # Lighter green
         self.root.update_idletasks()
@@ -236,8 +222,8 @@ class SlidingPuzzle:
                 btn.config(state="disabled")
 
     def enable_buttons(self):
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 if self.tiles[i][j] != 0:
                     self.buttons[i][j].config(state="normal")
 
@@ -254,15 +240,24 @@ class SlidingPuzzle:
         self.root.after(100, self._calculate_min_moves_internal)
 
     def _calculate_min_moves_internal(self):
+        if self.size > MAX_MIN_MOVES_SIZE:
+            self.min_moves_label.config(text=f"Optimal Moves: not computed above {MAX_MIN_MOVES_SIZE}x{MAX_MIN_MOVES_SIZE}", fg="gray")
+            self.status_label.config(text="Ready to play!", fg="blue")
+            return
         start_time = time.time()
         initial_flat_state = tuple(num for row in self.tiles for num in row)
         
-        # Run A* solver to find the path length
-        path = self._a_star_solver_core(initial_flat_state, return_path_only_length=True)
+        # Run the shared A* solver to find the path length
+        result = puzzle_solver.solve(initial_flat_state, "astar", time_limit=MIN_MOVES_TIME_LIMIT_S,
+                                     max_memory_mb=SOLVER_MEMORY_CAP_MB)
         
-        if path is not None:
-            self.min_moves = len(path) - 1 # Exclude initial state
+        if result.status == "solved":
+            self.min_moves = result.length
             self.min_moves_label.config(text=f"Optimal Moves: {self.min_moves}", fg="darkgreen")
+        elif result.solved:
+            # Budget ran out: best known length and how far off it may be
+            self.min_moves = result.length
+            self.min_moves_label.config(text=f"Optimal Moves: ≤ {result.length} (within {result.suboptimality:.2f}x)", fg="darkorange")
         else:
             self.min_moves_label.config(text="Optimal Moves: Not solvable", fg="red")
             messagebox.showerror("Error", "The current puzzle state is not solvable. This shouldn't happen with the shuffling logic.")
@@ -288,7 +283,9 @@ class SlidingPuzzle:
         self.root.after(100, lambda: self._start_solving_animation(initial_flat_state))
 
     def _start_solving_animation(self, initial_flat_state):
-        path = self._a_star_solver_core(initial_flat_state)
+        result = puzzle_solver.solve(initial_flat_state, "astar", time_limit=SOLVE_TIME_LIMIT_S,
+                                     max_memory_mb=SOLVER_MEMORY_CAP_MB)
+        path = result.path
         
         if path is None:
             messagebox.showinfo("No Solution", "No solution found!")
@@ -300,74 +297,6 @@ class SlidingPuzzle:
 
         self.animate_solution(path)
 
-    def _a_star_solver_core(self, start_state, return_path_only_length=False):
-        goal = tuple(list(range(1, SIZE*SIZE)) + [0])
-
-        def get_neighbors(state_tuple):
-            zero_pos = state_tuple.index(0)
-            neighbors = []
-            r, c = divmod(zero_pos, SIZE)
-            directions = [(-1,0),(1,0),(0,-1),(0,1)] # Up, Down, Left, Right
-            for dr, dc in directions:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < SIZE and 0 <= nc < SIZE:
-                    new_pos = nr*SIZE + nc
-                    new_state_list = list(state_tuple)
-                    new_state_list[zero_pos], new_state_list[new_pos] = new_state_list[new_pos], new_state_list[zero_pos]
-                    neighbors.append(tuple(new_state_list))
-            return neighbors
-
-        def manhattan(state_tuple):
-            dist = 0
-            for idx, val in enumerate(state_tuple):
-                if val == 0:
-                    continue
-                # Target row and column for value `val`
-                target_r, target_c = divmod(val - 1, SIZE)
-                # Current row and column of value `val`
-                current_r, current_c = divmod(idx, SIZE)
-                dist += abs(target_r - current_r) + abs(target_c - current_c)
-            return dist
-
-        open_set = [] # Min-heap of (f_score, g_score, state_tuple, path_list)
-        # The path_list here stores the sequence of states to reach the current state
-        # The g_score is the number of moves from the start
-        heapq.heappush(open_set, (manhattan(start_state), 0, start_state, [start_state]))
-        
-        # closed_set stores states that have been fully evaluated
-        closed_set = set() # Use a set for faster lookups
-
-        # came_from (optional for reconstruction, but path is built directly here)
-        
-        # Optimization: if we only need length, we don't need to store full paths
-        # This will save a lot of memory for long paths
-        g_scores = {start_state: 0} # Stores the g_score (cost from start) for a state
-
-        while open_set:
-            f, g, current_state, current_path = heapq.heappop(open_set)
-
-            if current_state == goal:
-                if return_path_only_length:
-                    return current_path # Return the path (list of states)
-                return current_path # Return the full path for animation
-
-            if current_state in closed_set:
-                continue
-            closed_set.add(current_state)
-
-            for neighbor in get_neighbors(current_state):
-                if neighbor in closed_set:
-                    continue
-
-                new_g = g + 1
-
-                # If neighbor already in open_set but with higher g_score, update it
-                if new_g < g_scores.get(neighbor, float('inf')):
-                    g_scores[neighbor] = new_g
-                    new_f = new_g + manhattan(neighbor)
-                    heapq.heappush(open_set, (new_f, new_g, neighbor, current_path + [neighbor]))
-        return None
-
     def animate_solution(self, path):
         # path includes the initial state, so actual moves = len(path) - 1
         self.move_count = 0
@@ -376,7 +305,7 @@ class SlidingPuzzle:
         def step(index):
             if index >= len(path):
                 # Animation finished
-                self.tiles = [list(path[-1][i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
+                self.tiles = [list(path[-1][i*self.size:(i+1)*self.size]) for i in range(self.size)]
                 self.update_ui() # Final update
                 self.show_victory() # Show victory message and handle game end
                 self.solve_button.config(state="disabled", text="Solve") # Keep disabled if solved
@@ -396,9 +325,9 @@ class SlidingPuzzle:
                 moved_tile_value = current_flat_state[prev_empty_idx]
                 # Find its new position for animation
                 moved_tile_pos_flat = current_flat_state.index(moved_tile_value)
-                moved_tile_pos = divmod(moved_tile_pos_flat, SIZE) # (row, col)
+                moved_tile_pos = divmod(moved_tile_pos_flat, self.size) # (row, col)
 
-            self.tiles = [list(current_flat_state[i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
+            self.tiles = [list(current_flat_state[i*self.size:(i+1)*self.size]) for i in range(self.size)]
             self.update_ui(animating_move=moved_tile_pos)
             
             # Only increment move count for actual moves, not initial state
@@ -411,6 +340,10 @@ class SlidingPuzzle:
         step(0) # Start animation from the first state in the path
 
 if __name__ == "__main__":
+    # python puzzle.py [size], e.g. 4 for the 15-puzzle
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    if not 2 <= size <= puzzle_solver.MAX_SIZE:
+        sys.exit(f"size must be between 2 and {puzzle_solver.MAX_SIZE}")
     root = tk.Tk()
-    game = SlidingPuzzle(root)
+    game = SlidingPuzzle(root, size)
     root.mainloop()
\ No newline at end of file
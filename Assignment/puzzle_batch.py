@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import puzzle_solver
+
+# Batch solving across a pool of worker processes, for grading large sets of scrambles.
+# Puzzles are handed out in chunks (one round trip per chunk rather than per puzzle) and
+# results come back either in input order or as soon as each one finishes.
+#
+# The big read-only tables (the 3x3 distance table and the 4x4 pattern databases) are
+# memory-mapped files, so every worker maps the same pages from the OS page cache rather
+# than holding its own copy. Each worker opens them once, in the pool initializer, not
+# once per puzzle.
+
+DEFAULT_CHUNKSIZE = 8
+
+_worker_algorithm = None
+_worker_options = {}
+
+def _init_worker(algorithm, options, sizes):
+    global _worker_algorithm, _worker_options
+    _worker_algorithm = algorithm
+    _worker_options = options
+    # Open the shared tables up front so the first puzzle of every worker isn't slower
+    if algorithm == "table":
+        import puzzle_table
+        puzzle_table.load_distance_table()
+    elif algorithm == "astar":
+        for size in sizes:
+            heuristic = options.get("heuristic")
+            if heuristic is None:
+                puzzle_solver.default_heuristic(size)
+            elif isinstance(heuristic, str):
+                puzzle_solver.get_heuristic(heuristic, size)
+
+def _solve_one(job):
+    index, state = job
+    try:
+        return index, puzzle_solver.solve(state, _worker_algorithm, **_worker_options)
+    except ValueError as e:
+        # One puzzle the options don't fit (e.g. -a table on 4x4) must not end the batch
+        return index, puzzle_solver.SolveResult(_worker_algorithm, None, 0, 0, 0.0, status="error", error=str(e))
+
+def solve_batch(states, algorithm="astar", workers=None, chunksize=DEFAULT_CHUNKSIZE, ordered=True, **options):
+    # Yields (index, SolveResult) for every state. ordered=False yields each result as
+    # soon as it is done. Options are the same as puzzle_solver.solve(), except cancel.
+    # workers defaults to the number of CPUs; workers=1 solves in this process.
+    states = [tuple(state) for state in states]
+    if algorithm not in puzzle_solver.SOLVERS:
+        raise ValueError(f"unknown algorithm {algorithm!r}, choose from {', '.join(puzzle_solver.ALGORITHMS)}")
+    workers = workers or os.cpu_count() or 1
+    sizes = sorted({puzzle_solver.board_size(state) for state in states})
+    if workers == 1:
+        _init_worker(algorithm, options, sizes)
+        for job in enumerate(states):
+            yield _solve_one(job)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(algorithm, options, sizes)) as pool:
+        jobs = enumerate(states)
+        results = pool.imap(_solve_one, jobs, chunksize) if ordered else pool.imap_unordered(_solve_one, jobs, chunksize)
+        for index, result in results:
+            yield index, result
+
+# --- Throughput Scaling ---
+
+def random_corpus(size, count, depth, seed=12):
+    import puzzle_pdb
+    rng = random.Random(seed)
+    return [puzzle_pdb.random_walk_state(size, depth, rng) for _ in range(count)]
+
+def benchmark_scaling(states, worker_counts=None, algorithm="astar", chunksize=DEFAULT_CHUNKSIZE, **options):
+    # Solves the same states with each worker count and prints puzzles per second
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1]*2 <= (os.cpu_count() or 1):
+            worker_counts.append(worker_counts[-1]*2)
+    print(f"{len(states)} puzzles, algorithm {algorithm}")
+    print(f"{'workers':>7} {'seconds':>9} {'puzzles/s':>10} {'speedup':>8}")
+    base_rate = None
+    rates = {}
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        for _ in solve_batch(states, algorithm, workers, chunksize, ordered=False, **options):
+            pass
+        elapsed = time.perf_counter() - start_time
+        rate = len(states) / elapsed
+        base_rate = base_rate or rate
+        rates[workers] = rate
+        print(f"{workers:>7} {elapsed:>9.2f} {rate:>10.1f} {rate/base_rate:>7.2f}x", flush=True)
+    return rates
+
+if __name__ == "__main__":
+    # python puzzle_batch.py [size] [count] [depth]
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    benchmark_scaling(random_corpus(size, count, depth))
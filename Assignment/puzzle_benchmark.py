@@ -0,0 +1,219 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import puzzle_pdb
+import puzzle_solver
+import puzzle_table
+
+# Reproducible solver benchmark.
+# A seeded corpus of 3x3 and 4x4 puzzles, grouped by optimal depth, is solved by every
+# configuration in BENCHMARK_CONFIGS. Per group it records wall time, nodes expanded,
+# nodes per second and peak traced memory, and writes it all as JSON. Given a baseline
+# JSON from an earlier run, it flags groups that got slower, expanded more nodes or used
+# more memory, and exits with status 1 so it can gate a change.
+#
+# Examples:
+#   python puzzle_benchmark.py --output baseline.json
+#   python puzzle_benchmark.py --baseline baseline.json --output current.json
+#   python puzzle_benchmark.py --sizes 3 --configs astar bfs --per-depth 3
+
+BENCHMARK_VERSION = 1
+DEFAULT_SEED = 2024
+DEFAULT_PER_DEPTH = 5
+
+# 3x3 puzzles are drawn at these exact optimal depths straight from the distance table.
+# 4x4 puzzles are random walks of these lengths, grouped by optimal depth in bands.
+DEPTHS_3X3 = [6, 12, 18, 24, 30]
+WALKS_4X4 = [20, 35, 50]
+DEPTH_BAND_4X4 = 10
+
+# Name -> (algorithm, options). Searches that cannot finish on a group are cut off by
+# NODE_BUDGET and show up as unsolved. A node budget keeps every config deterministic
+# except those in NONDETERMINISTIC_CONFIGS, whose node counts change from run to run.
+BENCHMARK_CONFIGS = {
+    "astar": ("astar", {}),
+    "astar-manhattan": ("astar", {"heuristic": "manhattan"}),
+    "astar-linear_conflict": ("astar", {"heuristic": "linear_conflict"}),
+    "astar-walking_distance": ("astar", {"heuristic": "walking_distance"}),
+    "astar-packed": ("astar", {"encoding": "packed"}),
+    "astar-heap": ("astar", {"frontier": "heap"}),
+    "arastar": ("arastar", {}),
+    "idastar": ("idastar", {}),
+    "bfs": ("bfs", {}),
+    "dfs": ("dfs", {}),
+    "table": ("table", {}),
+    "hdastar": ("hdastar", {"workers": 2}), # Peak memory covers the coordinator only
+}
+NONDETERMINISTIC_CONFIGS = {"hdastar"} # Worker processes interleave differently on every run
+NODE_BUDGET = 500000
+
+# A group counts as regressed when it is this much worse than the baseline
+TIME_TOLERANCE = 0.25   # Wall time is noisy, so allow 25%
+NODES_TOLERANCE = 0.0   # Node counts are deterministic, any increase is a change in the search
+                        # (not checked for NONDETERMINISTIC_CONFIGS)
+MEMORY_TOLERANCE = 0.10
+MIN_TIME_DELTA_S = 0.005 # Ignore time changes smaller than this, whatever the ratio
+
+# --- Corpus ---
+
+def corpus_3x3(rng, per_depth):
+    table = puzzle_table.load_distance_table()
+    distances = table.data[:] # bytes, so iterating gives ints
+    groups = {}
+    for depth in DEPTHS_3X3:
+        ranks = [r for r, dist in enumerate(distances) if dist == depth]
+        groups[f"d{depth}"] = [puzzle_table.unrank(r) for r in rng.sample(ranks, min(per_depth, len(ranks)))]
+    return groups
+
+def corpus_4x4(rng, per_depth):
+    # Optimal depths come from A* with the strongest heuristic available
+    groups = {}
+    for walk in WALKS_4X4:
+        for _ in range(per_depth):
+            state = puzzle_pdb.random_walk_state(4, walk, rng)
+            path, _, _ = puzzle_solver.a_star(state)
+            depth = len(path) - 1
+            low = depth // DEPTH_BAND_4X4 * DEPTH_BAND_4X4
+            groups.setdefault(f"d{low}-{low + DEPTH_BAND_4X4 - 1}", []).append(state)
+    return dict(sorted(groups.items(), key=lambda item: int(item[0][1:].split("-")[0])))
+
+def build_corpus(sizes, seed=DEFAULT_SEED, per_depth=DEFAULT_PER_DEPTH):
+    # {"3x3": {"d6": [state, ...], ...}, "4x4": {...}}; the same seed gives the same puzzles
+    corpus = {}
+    for size in sizes:
+        rng = random.Random(f"{seed}-{size}")
+        if size == 3:
+            corpus["3x3"] = corpus_3x3(rng, per_depth)
+        elif size == 4:
+            corpus["4x4"] = corpus_4x4(rng, per_depth)
+        else:
+            raise ValueError("the benchmark corpus covers 3x3 and 4x4 boards")
+    return corpus
+
+# --- Measuring ---
+
+def applicable(config, size):
+    algorithm, options = BENCHMARK_CONFIGS[config]
+    if algorithm == "table":
+        return size == puzzle_table.TABLE_SIZE
+    if options.get("heuristic") == "walking_distance":
+        return size <= 4
+    return True
+
+def measure(state, algorithm, options, trace_memory=True):
+    # Timed run first, then a second run under tracemalloc for the peak, so tracing
+    # overhead never leaks into the timings
+    result = puzzle_solver.solve(state, algorithm, max_nodes=NODE_BUDGET, **options)
+    peak = 0
+    if trace_memory:
+        traced = puzzle_solver.solve(state, algorithm, max_nodes=NODE_BUDGET, trace_memory=True, **options)
+        peak = traced.stats.peak_memory
+    return result, peak
+
+def run_group(states, config, trace_memory=True):
+    algorithm, options = BENCHMARK_CONFIGS[config]
+    stats = {"puzzles": len(states), "solved": 0, "moves": 0, "seconds": 0.0, "nodes": 0, "peak_memory_kb": 0}
+    for state in states:
+        result, peak = measure(state, algorithm, options, trace_memory)
+        if result.status == "solved":
+            stats["solved"] += 1
+            stats["moves"] += result.length
+        stats["seconds"] += result.elapsed
+        stats["nodes"] += result.nodes_explored
+        stats["peak_memory_kb"] = max(stats["peak_memory_kb"], peak // 1024)
+    stats["seconds"] = round(stats["seconds"], 6)
+    stats["nodes_per_second"] = round(stats["nodes"] / stats["seconds"]) if stats["seconds"] > 0 else 0
+    return stats
+
+def warm_up(sizes):
+    # Load every table once so no group pays for building or mapping one
+    for size in sizes:
+        puzzle_solver.default_heuristic(size)
+        puzzle_solver.get_heuristic("walking_distance", size)
+    if 3 in sizes:
+        puzzle_table.load_distance_table()
+
+def run_benchmark(sizes=(3, 4), configs=None, seed=DEFAULT_SEED, per_depth=DEFAULT_PER_DEPTH, trace_memory=True, log=sys.stderr):
+    configs = configs or list(BENCHMARK_CONFIGS)
+    corpus = build_corpus(sizes, seed, per_depth)
+    warm_up(sizes)
+    results = {}
+    for board, groups in corpus.items():
+        size = int(board[0])
+        for config in configs:
+            if not applicable(config, size):
+                continue
+            for group, states in groups.items():
+                key = f"{board}/{config}/{group}"
+                results[key] = run_group(states, config, trace_memory)
+                r = results[key]
+                print(f"{key:<40} {r['solved']}/{r['puzzles']} solved {r['seconds']:>9.3f}s "
+                      f"{r['nodes']:>9} nodes {r['nodes_per_second']:>8}/s {r['peak_memory_kb']:>7} KB", file=log, flush=True)
+    return {
+        "version": BENCHMARK_VERSION,
+        "seed": seed,
+        "per_depth": per_depth,
+        "node_budget": NODE_BUDGET,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+# --- Regression Check ---
+
+def compare(current, baseline):
+    # List of (key, metric, baseline value, current value) for every regressed group
+    if (current["seed"], current["per_depth"]) != (baseline["seed"], baseline["per_depth"]):
+        raise ValueError("baseline was run on a different corpus (seed / per-depth differ)")
+    regressions = []
+    for key, now in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue # New group, nothing to compare against
+        if now["solved"] < before["solved"]:
+            regressions.append((key, "solved", before["solved"], now["solved"]))
+        config = key.split("/")[1]
+        if config not in NONDETERMINISTIC_CONFIGS and now["nodes"] > before["nodes"] * (1 + NODES_TOLERANCE):
+            regressions.append((key, "nodes", before["nodes"], now["nodes"]))
+        if (now["seconds"] > before["seconds"] * (1 + TIME_TOLERANCE)
+                and now["seconds"] - before["seconds"] > MIN_TIME_DELTA_S):
+            regressions.append((key, "seconds", before["seconds"], now["seconds"]))
+        if before["peak_memory_kb"] and now["peak_memory_kb"] > before["peak_memory_kb"] * (1 + MEMORY_TOLERANCE):
+            regressions.append((key, "peak_memory_kb", before["peak_memory_kb"], now["peak_memory_kb"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sliding puzzle solvers on a fixed corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4], choices=[3, 4])
+    parser.add_argument("--configs", nargs="+", choices=list(BENCHMARK_CONFIGS), help="default: all of them")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--per-depth", type=int, default=DEFAULT_PER_DEPTH, help="puzzles per 3x3 depth / 4x4 walk length")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass (about half the run time)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against this earlier JSON output")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sizes, args.configs, args.seed, args.per_depth, not args.no_memory)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.no_memory:
+        for stats in list(report["results"].values()) + list(baseline["results"].values()):
+            stats["peak_memory_kb"] = 0
+    regressions = compare(report, baseline)
+    for key, metric, before, now in regressions:
+        print(f"REGRESSION {key}: {metric} {before} -> {now}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+import argparse
+import heapq
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+
+import puzzle_solver
+
+# Hash-distributed A* (HDA*) across worker processes.
+# Every state has one owner, picked by hashing its packed int, and only the owner keeps
+# its g-score, parent and open-list entry. A worker expands its own cheapest states and
+# sends each successor to that successor's owner, batched per owner, over the owner's
+# inbox queue. Duplicate detection happens at the owner, so both the expansions and the
+# closed set are split across the processes.
+#
+# A worker that receives the goal reports its cost to the coordinator, which broadcasts
+# it as the incumbent; workers then drop every state with f >= incumbent. The search is
+# over once no worker has anything below the incumbent and no batch is in flight. The
+# coordinator checks that in waves: it probes every worker for (idle, batches sent,
+# batches received), and stops after two consecutive waves in which all workers are
+# idle, sends equal receives, and the counts did not change in between (the four-counter
+# method; one wave alone can miss a batch that is still in a queue).
+# The path is then traced back one parent at a time, asking each state's owner.
+#
+# Neighbours, packing and heuristics are puzzle_solver's (move_table, the pattern
+# databases on 4x4 if built, else Manhattan). Each worker only sees its own open list,
+# so with more workers some states are expanded that one global list would have left
+# alone (search overhead); the benchmark prints node counts next to the times.
+#
+# Examples:
+#   python puzzle_hda.py --workers 1 2 4
+#   python puzzle_hda.py --count 3 --walk 60 --workers 2 4 8 --heuristic linear_conflict
+
+EXPAND_BATCH = 200 # Expansions between inbox checks and outgoing flushes
+PROBE_INTERVAL_S = 0.005 # Pause between termination probes
+RESULT_POLL_S = 0.1 # Longest wait for a worker message before checking liveness and the budget
+DEFAULT_COUNT = 5
+DEFAULT_WALK = 50
+
+def owner(state, workers):
+    # Same multiplicative hash as the DFS transposition table, so the low bits of the
+    # packed int (cell 0) do not decide the owner on their own
+    return (state * puzzle_solver.HASH_MULTIPLIER >> 32) % workers
+
+# --- Worker ---
+
+def _worker(index, workers, start_state, heuristic_name, inboxes, results):
+    size = puzzle_solver.board_size(start_state)
+    if heuristic_name is None:
+        heuristic = puzzle_solver.default_heuristic(size)
+    else:
+        heuristic = puzzle_solver.get_heuristic(heuristic_name, size)
+    bits = puzzle_solver.cell_bits(size)
+    mask = (1 << bits) - 1
+    shifts = [pos*bits for pos in range(size*size)]
+    moves_from = puzzle_solver.move_table(size)
+    goal = puzzle_solver.pack_state(puzzle_solver.goal_state(size))
+    inbox = inboxes[index]
+
+    g_scores = {} # state -> (g, parent state, move code), for the states this worker owns
+    open_heap = [] # (f, -g, state, blank), deepest first among equal f; stale once g improves
+    outboxes = [[] for _ in range(workers)]
+    incumbent = float('inf')
+    sent = received = expanded = 0
+
+    def add(state, g, blank, parent, move):
+        nonlocal incumbent
+        known = g_scores.get(state)
+        if known is not None and known[0] <= g:
+            return
+        g_scores[state] = (g, parent, move)
+        if state == goal:
+            if g < incumbent:
+                incumbent = g
+                results.put(("goal", index, g))
+            return
+        f = g + heuristic(puzzle_solver.unpack_state(state, size))
+        if f < incumbent:
+            heapq.heappush(open_heap, (f, -g, state, blank))
+
+    def has_work():
+        return bool(open_heap) and open_heap[0][0] < incumbent
+
+    while True:
+        # Take everything waiting; with nothing to expand, block until a message comes
+        while True:
+            try:
+                message = inbox.get(block=not has_work())
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == "states":
+                received += 1
+                for entry in message[1]:
+                    add(*entry)
+            elif kind == "incumbent":
+                incumbent = min(incumbent, message[1])
+            elif kind == "probe":
+                # Outboxes are always flushed by now, so sent is up to date
+                results.put(("status", index, message[1], not has_work(), sent, received, expanded, len(g_scores)))
+            elif kind == "parent":
+                g, parent, move = g_scores[message[1]]
+                results.put(("parent", message[1], parent, move))
+            elif kind == "stop":
+                results.put(("done", index, expanded, len(g_scores)))
+                return
+
+        for _ in range(EXPAND_BATCH):
+            if not has_work():
+                break
+            f, g, current, blank = heapq.heappop(open_heap)
+            g = -g
+            known = g_scores[current]
+            if known[0] != g:
+                continue # A cheaper route arrived after this entry was pushed
+            expanded += 1
+            parent = known[1]
+            for move, pos in moves_from[blank]:
+                tile = (current >> shifts[pos]) & mask
+                child = current - (tile << shifts[pos]) + (tile << shifts[blank])
+                if child == parent:
+                    continue
+                target = owner(child, workers)
+                if target == index:
+                    add(child, g + 1, pos, current, move)
+                else:
+                    outboxes[target].append((child, g + 1, pos, current, move))
+        for target, batch in enumerate(outboxes):
+            if batch:
+                inboxes[target].put(("states", batch))
+                outboxes[target] = []
+                sent += 1
+
+# --- Coordinator ---
+
+def _receive(results, processes, budget, nodes_explored, peak_nodes):
+    # Next message from the workers. While waiting, a dead worker raises RuntimeError
+    # (its part of the search is gone) and the budget's deadline and cancel still apply.
+    while True:
+        try:
+            return results.get(timeout=RESULT_POLL_S)
+        except queue.Empty:
+            pass
+        for i, process in enumerate(processes):
+            if not process.is_alive():
+                raise RuntimeError(f"HDA* worker {i} died (exit code {process.exitcode})")
+        if budget is not None:
+            budget.check(nodes_explored, peak_nodes)
+
+def hda_star(start_state, workers=None, heuristic=None, budget=None, stats=None):
+    # Returns (path, nodes_explored, peak_nodes) like the puzzle_solver solvers, with an
+    # optimal path. workers defaults to the number of CPUs; heuristic is a HEURISTICS
+    # name or None for the default. The budget is checked once per probe wave.
+    workers = workers or os.cpu_count() or 1
+    if heuristic is not None and not isinstance(heuristic, str):
+        raise ValueError("hda_star takes a heuristic by name, since it is rebuilt in every worker")
+    start_state = tuple(start_state)
+    size = puzzle_solver.board_size(start_state)
+    if heuristic is not None:
+        puzzle_solver.get_heuristic(heuristic, size) # Raises here rather than in every worker
+    start = puzzle_solver.pack_state(start_state)
+    goal = puzzle_solver.pack_state(puzzle_solver.goal_state(size))
+
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker, args=(i, workers, start_state, heuristic, inboxes, results), daemon=True)
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    incumbent = float('inf')
+    nodes_explored = peak_nodes = waves = 0
+    inboxes[owner(start, workers)].put(("states", [(start, 0, start_state.index(0), -1, -1)]))
+    try:
+        previous = None
+        while True:
+            waves += 1
+            for inbox in inboxes:
+                inbox.put(("probe", waves))
+            statuses = {}
+            while len(statuses) < workers:
+                message = _receive(results, processes, budget, nodes_explored, peak_nodes)
+                if message[0] == "goal" and message[2] < incumbent:
+                    incumbent = message[2]
+                    for inbox in inboxes:
+                        inbox.put(("incumbent", incumbent))
+                elif message[0] == "status" and message[2] == waves:
+                    statuses[message[1]] = message[3:]
+            idle = all(status[0] for status in statuses.values())
+            counts = tuple((statuses[i][1], statuses[i][2]) for i in range(workers))
+            nodes_explored = sum(status[3] for status in statuses.values())
+            peak_nodes = sum(status[4] for status in statuses.values())
+            if budget is not None and nodes_explored >= budget.next_check:
+                budget.check(nodes_explored, peak_nodes)
+            # The coordinator sent the start batch, so receives are one ahead of worker sends
+            balanced = idle and sum(s for s, r in counts) + 1 == sum(r for s, r in counts)
+            if balanced and counts == previous:
+                break
+            previous = counts if balanced else None
+            time.sleep(PROBE_INTERVAL_S)
+
+        path = None
+        if incumbent != float('inf'):
+            # Walk the parent links back from the goal, one owner at a time
+            codes = []
+            state = goal
+            while state != start:
+                inboxes[owner(state, workers)].put(("parent", state))
+                message = _receive(results, processes, budget, nodes_explored, peak_nodes)
+                while message[0] != "parent":
+                    message = _receive(results, processes, budget, nodes_explored, peak_nodes)
+                codes.append(message[3])
+                state = message[2]
+            codes.reverse()
+            path = puzzle_solver.apply_moves(start_state, codes)
+        return path, nodes_explored, peak_nodes
+    finally:
+        for inbox in inboxes:
+            inbox.put(("stop",))
+            inbox.cancel_join_thread() # Batches a dead or stopped worker never read must not block our exit
+        # After a crash the others may be stuck sending to the dead worker, so do not wait on them
+        done = 0
+        deadline = time.perf_counter() + 5
+        while done < workers and time.perf_counter() < deadline:
+            if any(process.exitcode for process in processes):
+                break
+            try:
+                message = results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if message[0] == "done":
+                done += 1
+        crashed = any(process.exitcode for process in processes)
+        for process in processes:
+            if not crashed:
+                process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        if stats is not None:
+            # Expansions and stored states summed over the workers; no single frontier
+            stats.record(nodes_explored, nodes_explored, 0, 0, peak_nodes)
+
+# --- Speedup Benchmark ---
+
+def benchmark_speedup(states, worker_counts=(1, 2, 4), heuristic=None):
+    # Solves every state with each worker count and prints time and speedup against one
+    # worker, with serial a_star on the same states as a reference
+    print(f"{len(states)} puzzles, {os.cpu_count()} CPUs, heuristic {heuristic or 'default'}")
+    print(f"{'workers':>7} {'seconds':>9} {'nodes':>10} {'speedup':>8}")
+    start_time = time.perf_counter()
+    serial_nodes = 0
+    lengths = []
+    for state in states:
+        path, nodes, _ = puzzle_solver.a_star(state, heuristic=heuristic)
+        serial_nodes += nodes
+        lengths.append(len(path) - 1)
+    serial = time.perf_counter() - start_time
+    print(f"{'a_star':>7} {serial:>9.2f} {serial_nodes:>10}")
+    base = None
+    timings = {}
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        nodes = 0
+        for state, length in zip(states, lengths):
+            path, explored, _ = hda_star(state, workers, heuristic)
+            if len(path) - 1 != length:
+                raise RuntimeError(f"HDA* found {len(path) - 1} moves, A* {length}, for {state}")
+            nodes += explored
+        elapsed = time.perf_counter() - start_time
+        base = base or elapsed
+        timings[workers] = elapsed
+        print(f"{workers:>7} {elapsed:>9.2f} {nodes:>10} {base/elapsed:>7.2f}x", flush=True)
+    return timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hash-distributed A* on random 4x4 puzzles.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to time")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="puzzles to solve")
+    parser.add_argument("--walk", type=int, default=DEFAULT_WALK, help="random walk length of each puzzle")
+    parser.add_argument("--heuristic", choices=puzzle_solver.HEURISTICS, help="default: pattern databases on 4x4 if built")
+    parser.add_argument("--seed", type=int, default=25)
+    args = parser.parse_args(argv)
+    import puzzle_pdb
+    rng = random.Random(args.seed)
+    states = [puzzle_pdb.random_walk_state(args.size, args.walk, rng) for _ in range(args.count)]
+    benchmark_speedup(states, args.workers, args.heuristic)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import puzzle_solver
+
+# Compact undo/redo history.
+# Each move is stored as one byte, the puzzle_solver move code (0 U, 1 D, 2 L, 3 R) of
+# the empty tile, in a bytearray, instead of a full board snapshot per move. Undo is the
+# inverse move (code ^ 1) and redo the move itself, so both are O(1). Every
+# KEYFRAME_INTERVAL moves a copy of the board is kept as a keyframe, so seek() reaches
+# any point by replaying at most KEYFRAME_INTERVAL moves from the nearest one.
+#
+# Past the cap, the oldest KEYFRAME_INTERVAL moves are dropped at once and the next
+# keyframe becomes the new start, so a long session holds at most cap bytes of moves
+# plus cap / KEYFRAME_INTERVAL boards.
+
+DEFAULT_HISTORY_CAP = 100000 # Moves kept (100 KB of move bytes)
+KEYFRAME_INTERVAL = 256
+
+class MoveHistory:
+    def __init__(self, start_state, cap=DEFAULT_HISTORY_CAP, keyframe_interval=KEYFRAME_INTERVAL):
+        if cap < keyframe_interval:
+            raise ValueError("the history cap must be at least one keyframe interval")
+        self.cap = cap
+        self.keyframe_interval = keyframe_interval
+        self.reset(start_state)
+
+    def reset(self, start_state):
+        self.size = puzzle_solver.board_size(start_state)
+        self.moves = bytearray()
+        self.position = 0 # Moves before position are done, the rest can be redone
+        self.board = list(start_state)
+        self.zero_pos = self.board.index(0)
+        self.keyframes = [tuple(start_state)] # keyframes[k]: board after k * keyframe_interval moves
+        self.dropped = 0 # Moves trimmed off the front by the cap
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def state(self):
+        return tuple(self.board)
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.moves)
+
+    def _slide(self, move):
+        dr, dc = puzzle_solver.DIRECTIONS[move]
+        new_pos = self.zero_pos + dr*self.size + dc
+        self.board[self.zero_pos], self.board[new_pos] = self.board[new_pos], 0
+        self.zero_pos = new_pos
+
+    def record(self, move):
+        # A new move from the current point; anything that could be redone is discarded
+        if self.position < len(self.moves):
+            del self.moves[self.position:]
+            del self.keyframes[self.position // self.keyframe_interval + 1:]
+        self._slide(move)
+        self.moves.append(move)
+        self.position += 1
+        if self.position % self.keyframe_interval == 0:
+            self.keyframes.append(self.state)
+        if len(self.moves) > self.cap:
+            del self.moves[:self.keyframe_interval]
+            del self.keyframes[0]
+            self.position -= self.keyframe_interval
+            self.dropped += self.keyframe_interval
+
+    def undo(self):
+        self.position -= 1
+        self._slide(self.moves[self.position] ^ 1)
+        return self.state
+
+    def redo(self):
+        self._slide(self.moves[self.position])
+        self.position += 1
+        return self.state
+
+    def seek(self, position):
+        # Jump to any point between the oldest kept move and the newest one
+        if not 0 <= position <= len(self.moves):
+            raise IndexError(f"history position {position} out of range 0..{len(self.moves)}")
+        keyframe = position // self.keyframe_interval
+        self.board = list(self.keyframes[keyframe])
+        self.zero_pos = self.board.index(0)
+        for move in self.moves[keyframe*self.keyframe_interval:position]:
+            self._slide(move)
+        self.position = position
+        return self.state
@@ -0,0 +1,188 @@
+import mmap
+import os
+import random
+import sys
+import time
+from collections import deque
+
+import puzzle_solver
+
+# Disjoint additive pattern databases (PDBs) for the 4x4 (15-puzzle) board.
+# The tiles are split into disjoint groups. For each group, a 0-1 BFS from the goal finds
+# the fewest moves *of that group's tiles* needed to put them home (moves of other tiles
+# are free). Because no move is counted twice, the per-group values can be added and the
+# sum is still an admissible heuristic, and a much stronger one than Manhattan distance.
+#
+# Each database is one byte per placement of its tiles, indexed by a mixed-radix rank of
+# the tile positions. Build them once offline with
+#     python puzzle_pdb.py build
+# and they are memory-mapped lazily the first time a 4x4 solve asks for them.
+
+PDB_SIZE = 4
+PDB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle_tables")
+
+# Tile groups, chosen as compact blocks of the goal board. 5-5-5 builds in a few minutes
+# in pure Python; 6-6-3 is stronger but its 6-tile databases take far longer to build.
+PARTITIONS = {
+    "5-5-5": [(1, 2, 5, 6, 9), (3, 4, 7, 8, 12), (10, 11, 13, 14, 15)],
+    "6-6-3": [(1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)],
+}
+DEFAULT_PARTITION = "5-5-5"
+
+# --- Ranking tile placements ---
+
+def placement_count(num_tiles, cells=PDB_SIZE*PDB_SIZE):
+    count = 1
+    for i in range(num_tiles):
+        count *= cells - i
+    return count
+
+def rank_positions(positions, cells=PDB_SIZE*PDB_SIZE):
+    # Mixed-radix rank of k distinct cells out of n: digit i is the position among the
+    # cells not used by earlier tiles, in base (n - i)
+    r = 0
+    for i, p in enumerate(positions):
+        smaller = 0
+        for q in positions[:i]:
+            if q < p:
+                smaller += 1
+        r = r*(cells - i) + p - smaller
+    return r
+
+def pdb_path(tiles):
+    return os.path.join(PDB_DIR, f"pdb_{PDB_SIZE}x{PDB_SIZE}_" + "-".join(map(str, tiles)) + ".bin")
+
+# --- Building ---
+
+def build_pattern_database(tiles, path=None):
+    path = path or pdb_path(tiles)
+    cells = PDB_SIZE*PDB_SIZE
+    unseen = 255
+    table = bytearray([unseen]) * placement_count(len(tiles))
+    # Visited is per (placement, blank cell), since the blank decides which tiles can move
+    visited = bytearray(len(table) * cells)
+
+    goal_positions = tuple(tile - 1 for tile in tiles)
+    queue = deque([(goal_positions, cells - 1, rank_positions(goal_positions), 0)]) # (positions, blank, rank, cost)
+
+    # 0-1 BFS: free moves go to the front of the queue, pattern moves to the back, so
+    # states come off the queue in cost order and each placement is first seen at its
+    # minimum cost. States are marked visited when popped, as a cheaper route may still
+    # be queued behind a costlier one.
+    while queue:
+        positions, blank, r, cost = queue.popleft()
+        key = r*cells + blank
+        if visited[key]:
+            continue
+        visited[key] = 1
+        if table[r] == unseen:
+            table[r] = cost
+        br, bc = divmod(blank, PDB_SIZE)
+        for dr, dc in puzzle_solver.DIRECTIONS:
+            nr, nc = br+dr, bc+dc
+            if not (0 <= nr < PDB_SIZE and 0 <= nc < PDB_SIZE):
+                continue
+            cell = nr*PDB_SIZE + nc
+            if cell in positions:
+                # A pattern tile slides into the blank: costs one move
+                new_positions = tuple(blank if p == cell else p for p in positions)
+                new_rank = rank_positions(new_positions)
+                if not visited[new_rank*cells + cell]:
+                    queue.append((new_positions, cell, new_rank, cost + 1))
+            elif not visited[r*cells + cell]:
+                queue.appendleft((positions, cell, r, cost))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(table)
+    os.replace(tmp_path, path)
+    return path
+
+def build_partition(partition=DEFAULT_PARTITION):
+    for tiles in PARTITIONS[partition]:
+        start_time = time.perf_counter()
+        path = build_pattern_database(tiles)
+        print(f"Wrote {path} in {time.perf_counter() - start_time:.1f}s", flush=True)
+
+# --- Lookup ---
+
+class PatternDatabaseHeuristic:
+    def __init__(self, partition=DEFAULT_PARTITION):
+        self.partition = partition
+        self.groups = PARTITIONS[partition]
+        self.tables = []
+        for tiles in self.groups:
+            with open(pdb_path(tiles), "rb") as f:
+                self.tables.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __call__(self, state):
+        where = [0] * len(state) # where[tile] = cell index of that tile
+        for idx, val in enumerate(state):
+            where[val] = idx
+        total = 0
+        for tiles, table in zip(self.groups, self.tables):
+            total += table[rank_positions([where[tile] for tile in tiles])]
+        return total
+
+    def close(self):
+        for table in self.tables:
+            table.close()
+
+def partition_available(partition=DEFAULT_PARTITION):
+    return all(os.path.exists(pdb_path(tiles)) for tiles in PARTITIONS[partition])
+
+_loaded = {}
+
+def load_heuristic(partition=DEFAULT_PARTITION):
+    # Memory-maps the databases the first time they are asked for, None if not built yet
+    if partition not in _loaded:
+        if not partition_available(partition):
+            return None
+        _loaded[partition] = PatternDatabaseHeuristic(partition)
+    return _loaded[partition]
+
+# --- Benchmark: PDB vs Manhattan node counts ---
+
+def random_walk_state(size, depth, rng):
+    # Scramble by random moves from the goal, never undoing the previous move
+    state = puzzle_solver.goal_state(size)
+    last = None
+    for _ in range(depth):
+        options = [(m, s) for m, s in puzzle_solver.get_moves(state) if last is None or m != last ^ 1]
+        last, state = rng.choice(options)
+    return state
+
+def benchmark(count=10, depth=40, seed=15, partition=DEFAULT_PARTITION):
+    pdb = load_heuristic(partition)
+    if pdb is None:
+        print("Pattern databases not built yet, run: python puzzle_pdb.py build")
+        return
+    rng = random.Random(seed)
+    totals = {"manhattan": [0, 0.0], "pdb": [0, 0.0]}
+    print(f"{'#':>3} {'len':>4} {'manhattan nodes':>16} {'pdb nodes':>10} {'ratio':>7}")
+    for i in range(count):
+        state = random_walk_state(PDB_SIZE, depth, rng)
+        results = {}
+        for name, heuristic in (("manhattan", puzzle_solver.manhattan), ("pdb", pdb)):
+            start_time = time.perf_counter()
+            path, nodes, _ = puzzle_solver.a_star(state, heuristic=heuristic)
+            totals[name][0] += nodes
+            totals[name][1] += time.perf_counter() - start_time
+            results[name] = (len(path) - 1, nodes)
+        assert results["manhattan"][0] == results["pdb"][0], "heuristics disagree on optimal length"
+        m_nodes, p_nodes = results["manhattan"][1], results["pdb"][1]
+        print(f"{i+1:>3} {results['pdb'][0]:>4} {m_nodes:>16} {p_nodes:>10} {m_nodes/p_nodes:>6.1f}x")
+    m_total, p_total = totals["manhattan"], totals["pdb"]
+    print(f"Total nodes: manhattan {m_total[0]} ({m_total[1]:.2f}s), "
+          f"pdb {p_total[0]} ({p_total[1]:.2f}s), {m_total[0]/p_total[0]:.1f}x fewer nodes")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    partition = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PARTITION
+    if command == "build":
+        build_partition(partition)
+    elif command == "benchmark":
+        benchmark(partition=partition)
+    else:
+        print("usage: python puzzle_pdb.py [build|benchmark] [5-5-5|6-6-3]")
@@ -0,0 +1,308 @@
+import argparse
+import glob
+import mmap
+import os
+import statistics
+import struct
+import sys
+import time
+from array import array
+
+import puzzle_solver
+
+# Append-only binary game logs.
+# One file per game: a header with the start board, then one byte per board change and
+# a few solver events, appended as they happen, so a crash loses at most the last write.
+#
+#   header  b"SPZL", version, board size, start time (float64), start board (one byte per cell)
+#   move    one byte, source << 2 | move code of the empty tile (0 U, 1 D, 2 L, 3 R)
+#   event   one byte >= EVENT_MIN_MOVES, then its fixed or length-prefixed payload
+#
+# Undo and redo are logged as the board change they make (undo logs the inverse move),
+# so replaying every move byte in order always reproduces the board.
+# Playback memory-maps the file; seeking indexes the move offsets once and replays from
+# the start board.
+#
+# Examples:
+#   python puzzle_replay.py show replays/game_20240101_120000_1234_1.spz --move 10
+#   python puzzle_replay.py stats replays/
+
+LOG_MAGIC = b"SPZL"
+LOG_VERSION = 1
+HEADER = struct.Struct("<4sBBd") # magic, version, size, start time
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+
+# Move sources (upper bits of a move byte)
+SOURCE_PLAYER = 0
+SOURCE_UNDO = 1
+SOURCE_REDO = 2
+SOURCE_SOLVER = 3 # Solution animation
+SOURCE_NAMES = ["player", "undo", "redo", "solver"]
+
+# Event bytes and their payloads
+EVENT_MIN_MOVES = 0xF0 # Exact optimal distance of the start board, uint16
+EVENT_SOLVE = 0xF1     # Solver run: algorithm, status (length-prefixed ascii), nodes, seconds, length
+EVENT_HINT = 0xF2      # A hint was shown, no payload
+EVENT_SOLVED = 0xFF    # The board reached the goal, no payload
+MIN_MOVES = struct.Struct("<H")
+SOLVE_STATS = struct.Struct("<IfH") # nodes, seconds, length (NO_LENGTH if no path)
+NO_LENGTH = 0xFFFF
+
+# --- Writing ---
+
+_log_counter = 0
+
+def new_log_path(directory=REPLAY_DIR):
+    global _log_counter
+    _log_counter += 1
+    name = f"game_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{_log_counter}.spz"
+    return os.path.join(directory, name)
+
+class GameLog:
+    def __init__(self, start_state, path=None):
+        self.path = path or new_log_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        size = puzzle_solver.board_size(start_state)
+        self.file = open(self.path, "ab")
+        self._write(HEADER.pack(LOG_MAGIC, LOG_VERSION, size, time.time()) + bytes(start_state))
+
+    def _write(self, data):
+        self.file.write(data)
+        self.file.flush() # Every record reaches the OS as soon as it happens
+
+    def move(self, move, source=SOURCE_PLAYER):
+        self._write(bytes((source << 2 | move,)))
+
+    def min_moves(self, distance):
+        self._write(bytes((EVENT_MIN_MOVES,)) + MIN_MOVES.pack(distance))
+
+    def solve(self, result):
+        algorithm = result.algorithm.encode("ascii")
+        status = result.status.encode("ascii")
+        length = result.length if result.solved else NO_LENGTH
+        self._write(bytes((EVENT_SOLVE, len(algorithm))) + algorithm + bytes((len(status),)) + status
+                    + SOLVE_STATS.pack(result.nodes_explored, result.elapsed, min(length, NO_LENGTH)))
+
+    def hint(self):
+        self._write(bytes((EVENT_HINT,)))
+
+    def solved(self):
+        self._write(bytes((EVENT_SOLVED,)))
+
+    def close(self):
+        self.file.close()
+
+# --- Reading ---
+
+class ReplayLog:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError(f"{path} is too short to be a game log")
+        magic, version, self.size, self.started = HEADER.unpack_from(self.data)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {LOG_VERSION} game log")
+        self.body = HEADER.size + self.size*self.size # Offset of the first record
+        self.start_state = tuple(self.data[HEADER.size:self.body])
+        self._move_offsets = None
+
+    def records(self):
+        # Yields (file offset, kind, payload): ("move", (source, move code)) or
+        # ("min_moves" | "solve" | "hint" | "solved", payload)
+        data = self.data
+        pos = self.body
+        end = len(data)
+        while pos < end:
+            offset = pos
+            byte = data[pos]
+            pos += 1
+            if byte < EVENT_MIN_MOVES:
+                yield offset, "move", (byte >> 2, byte & 3)
+            elif byte == EVENT_MIN_MOVES:
+                if pos + MIN_MOVES.size > end:
+                    return # Cut off mid-record (the game was still being written)
+                yield offset, "min_moves", MIN_MOVES.unpack_from(data, pos)[0]
+                pos += MIN_MOVES.size
+            elif byte == EVENT_SOLVE:
+                try:
+                    algorithm = data[pos + 1:pos + 1 + data[pos]].decode("ascii")
+                    pos += 1 + data[pos]
+                    status = data[pos + 1:pos + 1 + data[pos]].decode("ascii")
+                    pos += 1 + data[pos]
+                    nodes, seconds, length = SOLVE_STATS.unpack_from(data, pos)
+                except (IndexError, struct.error):
+                    return
+                pos += SOLVE_STATS.size
+                yield offset, "solve", {"algorithm": algorithm, "status": status, "nodes": nodes, "seconds": seconds,
+                                        "length": None if length == NO_LENGTH else length}
+            elif byte == EVENT_HINT:
+                yield offset, "hint", None
+            elif byte == EVENT_SOLVED:
+                yield offset, "solved", None
+            else:
+                raise ValueError(f"{self.path}: unknown record byte {byte:#x} at offset {pos - 1}")
+
+    @property
+    def move_offsets(self):
+        # File offset of every move byte, found with one scan on first use
+        if self._move_offsets is None:
+            self._move_offsets = array("I", (offset for offset, kind, _ in self.records() if kind == "move"))
+        return self._move_offsets
+
+    def __len__(self):
+        return len(self.move_offsets)
+
+    def moves(self):
+        return [(byte >> 2, byte & 3) for byte in (self.data[offset] for offset in self.move_offsets)]
+
+    def state_at(self, index):
+        # The board after the first index moves (0 is the start board)
+        if not 0 <= index <= len(self):
+            raise IndexError(f"move {index} out of range 0..{len(self)}")
+        board = list(self.start_state)
+        zero_pos = board.index(0)
+        for offset in self.move_offsets[:index]:
+            dr, dc = puzzle_solver.DIRECTIONS[self.data[offset] & 3]
+            new_pos = zero_pos + dr*self.size + dc
+            board[zero_pos], board[new_pos] = board[new_pos], 0
+            zero_pos = new_pos
+        return tuple(board)
+
+    def play(self):
+        # Every board from the start, one per move
+        board = list(self.start_state)
+        zero_pos = board.index(0)
+        yield tuple(board)
+        for offset in self.move_offsets:
+            dr, dc = puzzle_solver.DIRECTIONS[self.data[offset] & 3]
+            new_pos = zero_pos + dr*self.size + dc
+            board[zero_pos], board[new_pos] = board[new_pos], 0
+            zero_pos = new_pos
+            yield tuple(board)
+
+    def close(self):
+        self.data.close()
+
+# --- Aggregation ---
+
+def summarize(path):
+    # One pass over the records: what happened in this game
+    log = ReplayLog(path)
+    try:
+        game = {"path": path, "size": log.size, "min_moves": None, "moves": 0, "undos": 0,
+                "solver_undos": 0, "hints": 0, "solves": 0, "solved_by": None}
+        # Undo and redo act on an earlier move, so they are put down to that move's source
+        applied = bytearray() # Source of every move on the board now, oldest first
+        undone = bytearray()  # Sources of the undone moves, the next one to redo last
+        undos = [0] * len(SOURCE_NAMES)
+        last_source = None
+        for _, kind, payload in log.records():
+            if kind == "move":
+                source = payload[0]
+                if source == SOURCE_UNDO:
+                    source = applied.pop() if applied else SOURCE_PLAYER
+                    undone.append(source)
+                    undos[source] += 1
+                elif source == SOURCE_REDO:
+                    source = undone.pop() if undone else SOURCE_PLAYER
+                    applied.append(source)
+                else:
+                    applied.append(source)
+                    undone.clear() # A new move ends the redo chain, as in MoveHistory.record
+                last_source = source
+            elif kind == "min_moves":
+                game["min_moves"] = payload
+            elif kind == "hint":
+                game["hints"] += 1
+            elif kind == "solve":
+                game["solves"] += 1
+            elif kind == "solved":
+                game["solved_by"] = "solver" if last_source == SOURCE_SOLVER else "player"
+    finally:
+        log.close()
+    # Moves the player is charged for: their own moves still on the board
+    game["moves"] = applied.count(SOURCE_PLAYER)
+    game["undos"] = undos[SOURCE_PLAYER]
+    game["solver_undos"] = undos[SOURCE_SOLVER]
+    game["efficiency"] = None
+    if game["solved_by"] == "player" and game["min_moves"] and game["moves"]:
+        game["efficiency"] = game["min_moves"] / game["moves"]
+    return game
+
+def find_logs(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.spz")))
+        else:
+            yield path
+
+def aggregate(games):
+    # Per board size: games, player solves, solver solves, and move efficiency
+    # (optimal moves / moves used) over player-solved games with a known optimum
+    by_size = {}
+    for game in games:
+        group = by_size.setdefault(game["size"], {"games": 0, "player_solved": 0, "solver_solved": 0, "efficiencies": []})
+        group["games"] += 1
+        if game["solved_by"] == "player":
+            group["player_solved"] += 1
+        elif game["solved_by"] == "solver":
+            group["solver_solved"] += 1
+        if game["efficiency"] is not None:
+            group["efficiencies"].append(game["efficiency"])
+    return by_size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back and summarize sliding puzzle game logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print the board of one log at a given move")
+    show.add_argument("log")
+    show.add_argument("--move", type=int, help="default: the last move")
+    stats = commands.add_parser("stats", help="move efficiency across many logs")
+    stats.add_argument("paths", nargs="*", default=[REPLAY_DIR], help="log files or directories (default: replays/)")
+    stats.add_argument("--per-game", action="store_true", help="also print one line per game")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        log = ReplayLog(args.log)
+        index = len(log) if args.move is None else args.move
+        state = log.state_at(index)
+        print(f"{args.log}: move {index} of {len(log)}")
+        for r in range(log.size):
+            print(" ".join(f"{val:>2}" if val else " ." for val in state[r*log.size:(r + 1)*log.size]))
+        for _, kind, payload in log.records():
+            if kind != "move":
+                print(kind, payload if payload is not None else "")
+        log.close()
+        return 0
+
+    start_time = time.perf_counter()
+    games = []
+    for path in find_logs(args.paths):
+        try:
+            games.append(summarize(path))
+        except (OSError, ValueError) as e:
+            print(f"skipping {path}: {e}", file=sys.stderr)
+    if args.per_game:
+        for game in games:
+            efficiency = f"{game['efficiency']:.2f}" if game["efficiency"] is not None else "-"
+            print(f"{os.path.basename(game['path'])} {game['size']}x{game['size']} moves {game['moves']} "
+                  f"optimal {game['min_moves'] if game['min_moves'] is not None else '-'} "
+                  f"efficiency {efficiency} solved by {game['solved_by'] or '-'}")
+    for size, group in sorted(aggregate(games).items()):
+        line = (f"{size}x{size}: {group['games']} games, {group['player_solved']} solved by the player, "
+                f"{group['solver_solved']} by the solver")
+        if group["efficiencies"]:
+            line += (f", efficiency mean {statistics.mean(group['efficiencies']):.2f} "
+                     f"median {statistics.median(group['efficiencies']):.2f} "
+                     f"({sum(e == 1 for e in group['efficiencies'])} optimal)")
+        print(line)
+    elapsed = time.perf_counter() - start_time
+    print(f"{len(games)} logs in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import argparse
+import random
+import sys
+import time
+from array import array
+
+import puzzle_solver
+import puzzle_table
+
+# Difficulty-targeted scrambles.
+# Asks for boards whose optimal solution length lies in [min_distance, max_distance]
+# (or is exactly min_distance) and gets them without running a solver.
+#
+# 3x3: every solvable state's exact distance is in the distance table, so states are
+# drawn uniformly from the ranks at the wanted distances and unranked. Every board is
+# exact.
+#
+# Bigger boards: a random walk from the goal that never undoes its previous move and
+# prefers moves that push a tile further from its goal cell. A walk of t moves proves
+# the optimal distance is at most t, and an admissible heuristic proves it is at least
+# h, so a board is accepted once [h, t] fits inside the requested range. Manhattan
+# distance is updated in O(1) per step; if it falls short, linear conflict and the
+# default heuristic (pattern databases on 4x4) get a chance to raise the lower bound.
+#
+# Examples:
+#   python puzzle_scramble.py 3 20 -n 1000 > d20.txt
+#   python puzzle_scramble.py 4 30 40 -n 500 --seed 7 > medium_4x4.txt
+
+MAX_ATTEMPTS = 10000 # Walks tried per board before giving up on the requested range
+
+class Scramble:
+    def __init__(self, state, lower, upper):
+        self.state = state
+        self.lower = lower # Optimal distance is >= lower
+        self.upper = upper # and <= upper; the two are equal when it is known exactly
+
+    @property
+    def exact(self):
+        return self.lower == self.upper
+
+    def __repr__(self):
+        return f"Scramble({self.state}, lower={self.lower}, upper={self.upper})"
+
+# --- 3x3: Distance Table ---
+
+_ranks_by_distance = None
+
+def ranks_by_distance():
+    # ranks_by_distance()[d]: array of the permutation ranks of every 3x3 state exactly
+    # d moves from the goal. Built once per process from the memory-mapped table (~50 ms).
+    global _ranks_by_distance
+    if _ranks_by_distance is None:
+        distances = puzzle_table.load_distance_table().data[:] # bytes, so iterating gives ints
+        groups = [array("I") for _ in range(max(d for d in distances if d != puzzle_table.UNREACHABLE) + 1)]
+        for r, dist in enumerate(distances):
+            if dist != puzzle_table.UNREACHABLE:
+                groups[dist].append(r)
+        _ranks_by_distance = groups
+    return _ranks_by_distance
+
+def _table_scramble(min_distance, max_distance, rng):
+    groups = ranks_by_distance()
+    counts = [len(groups[d]) for d in range(min_distance, min(max_distance, len(groups) - 1) + 1)]
+    if not sum(counts):
+        raise ValueError(f"3x3 boards are at most {len(groups) - 1} moves from the goal")
+    # Weighting each distance by its number of states makes the draw uniform over all
+    # states in the range
+    dist = rng.choices(range(min_distance, min_distance + len(counts)), weights=counts)[0]
+    state = puzzle_table.unrank(rng.choice(groups[dist]))
+    return Scramble(state, dist, dist)
+
+# --- Bigger Boards: Guided Walks ---
+
+def _walk(size, length, rng):
+    # Non-backtracking walk from the goal; returns the board and its Manhattan distance
+    moves = puzzle_solver.move_table(size)
+    dist = puzzle_solver.manhattan_table(size)
+    board = list(puzzle_solver.goal_state(size))
+    zero_pos = len(board) - 1
+    h = 0
+    last = None
+    for _ in range(length):
+        away = [] # Moves that take the sliding tile further from its goal cell (h + 1)
+        other = []
+        for move, pos in moves[zero_pos]:
+            if last is not None and move == last ^ 1:
+                continue
+            tile = board[pos]
+            (away if dist[tile][zero_pos] > dist[tile][pos] else other).append((move, pos))
+        last, pos = rng.choice(away or other)
+        tile = board[pos]
+        h += dist[tile][zero_pos] - dist[tile][pos]
+        board[zero_pos], board[pos] = tile, 0
+        zero_pos = pos
+    return tuple(board), h
+
+def _walk_scramble(size, min_distance, max_distance, rng, max_attempts):
+    filters = [puzzle_solver.linear_conflict]
+    strongest = puzzle_solver.default_heuristic(size)
+    if strongest is not puzzle_solver.manhattan:
+        filters.append(strongest)
+    for _ in range(max_attempts):
+        length = rng.randint(min_distance, max_distance)
+        state, lower = _walk(size, length, rng)
+        for heuristic in filters:
+            if lower >= min_distance:
+                break
+            lower = max(lower, heuristic(state))
+        if lower >= min_distance:
+            return Scramble(state, lower, length)
+    raise ValueError(f"no {size}x{size} board with a provable distance in [{min_distance}, {max_distance}] "
+                     f"after {max_attempts} walks, widen the range")
+
+# --- Public API ---
+
+def scramble(size, min_distance, max_distance=None, rng=random, max_attempts=MAX_ATTEMPTS):
+    # One board whose optimal distance is min_distance, or anywhere in
+    # [min_distance, max_distance]. Returns a Scramble with the proven bounds.
+    max_distance = min_distance if max_distance is None else max_distance
+    if not 0 <= min_distance <= max_distance:
+        raise ValueError("need 0 <= min_distance <= max_distance")
+    if size == puzzle_table.TABLE_SIZE:
+        return _table_scramble(min_distance, max_distance, rng)
+    return _walk_scramble(size, min_distance, max_distance, rng, max_attempts)
+
+def scrambles(size, count, min_distance, max_distance=None, rng=random, max_attempts=MAX_ATTEMPTS):
+    for _ in range(count):
+        yield scramble(size, min_distance, max_distance, rng, max_attempts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate sliding puzzles at a given optimal distance.")
+    parser.add_argument("size", type=int)
+    parser.add_argument("min_distance", type=int)
+    parser.add_argument("max_distance", type=int, nargs="?", help="default: exactly min_distance")
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    if not 2 <= args.size <= puzzle_solver.MAX_SIZE:
+        parser.error(f"size must be between 2 and {puzzle_solver.MAX_SIZE}")
+    rng = random.Random(args.seed)
+    start_time = time.perf_counter()
+    try:
+        # Output is one puzzle per line for solve_puzzles.py, bounds in a "#" comment
+        for s in scrambles(args.size, args.count, args.min_distance, args.max_distance, rng):
+            bounds = str(s.lower) if s.exact else f"{s.lower}-{s.upper}"
+            print(" ".join(map(str, s.state)), f"# distance {bounds}")
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start_time
+    rate = args.count / elapsed if elapsed > 0 else 0.0
+    print(f"{args.count} puzzles in {elapsed:.2f}s ({rate:.0f} puzzles/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
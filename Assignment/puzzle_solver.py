@@ -0,0 +1,1226 @@
+import cProfile
+import heapq
+import math
+import random
+import threading
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict
+from functools import lru_cache, partial
+
+# Headless sliding puzzle solvers. Nothing in here imports tkinter, so the solvers
+# can be used from scripts, the command line (solve_puzzles.py) or the GUI (new.py).
+# States are flat tuples read row by row, with 0 for the empty tile. The board size
+# is worked out from the length of the state, so 3x3, 4x4, ... all work the same way.
+
+# --- Move Codes ---
+# A move code says which way the empty tile travels: Up, Down, Left, Right
+DIRECTIONS = [(-1,0),(1,0),(0,-1),(0,1)]
+MOVE_NAMES = "UDLR"
+
+ALGORITHMS = ["astar", "arastar", "hdastar", "idastar", "bfs", "dfs", "table"]
+
+# --- Search Budgets ---
+# Every solver takes an optional SearchBudget and calls budget.check() once
+# nodes_explored reaches budget.next_check. A budget can cap expanded nodes, wall-clock
+# time and the estimated memory of stored nodes, and can carry a cancel object with an
+# is_set() method (such as a threading.Event set from the GUI thread). When any of them
+# runs out, check() raises SearchStopped with a reason code and the best lower bound the
+# solver has proven so far; solve() then falls back to a quick weighted A* path.
+CHECK_INTERVAL = 1024 # Expanded nodes between time/memory/cancel checks
+BYTES_PER_STORED_NODE = 300 # Rough memory per stored node (state in sets/dicts + heap entry), from tracemalloc
+
+STOP_REASONS = ["cancelled", "node_budget", "deadline", "memory"]
+
+class SearchStopped(Exception):
+    def __init__(self, reason, nodes_explored, lower_bound=0):
+        super().__init__(f"search stopped ({reason}) after {nodes_explored} nodes")
+        self.reason = reason
+        self.nodes_explored = nodes_explored
+        self.lower_bound = lower_bound # The optimal solution is at least this long
+        # Anytime solvers attach the best path found before the stop and its bound
+        self.path = None
+        self.suboptimality = None
+
+class SearchBudget:
+    def __init__(self, max_nodes=None, time_limit=None, max_memory_mb=None, cancel=None):
+        self.max_nodes = max_nodes
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.max_stored_nodes = None
+        if max_memory_mb is not None:
+            self.max_stored_nodes = int(max_memory_mb * 1024 * 1024 / BYTES_PER_STORED_NODE)
+        self.cancel = cancel
+        self.next_check = self._next_check(0)
+
+    def _next_check(self, nodes_explored):
+        # Node budgets are checked exactly, everything else every CHECK_INTERVAL nodes
+        next_check = nodes_explored + CHECK_INTERVAL
+        if self.max_nodes is not None and self.max_nodes < next_check:
+            next_check = self.max_nodes
+        return next_check
+
+    def check(self, nodes_explored, stored_nodes, lower_bound=0):
+        reason = None
+        if self.cancel is not None and self.cancel.is_set():
+            reason = "cancelled"
+        elif self.max_nodes is not None and nodes_explored >= self.max_nodes:
+            reason = "node_budget"
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            reason = "deadline"
+        elif self.max_stored_nodes is not None and stored_nodes >= self.max_stored_nodes:
+            reason = "memory"
+        if reason is not None:
+            raise SearchStopped(reason, nodes_explored, lower_bound)
+        self.next_check = self._next_check(nodes_explored)
+
+# Fallback when a budget runs out: weighted A* (f = g + w*h) finds a path quickly and,
+# with an admissible h, that path is at most w times longer than optimal. With a time
+# limit, the exact search stops after (1 - FALLBACK_TIME_SHARE) of it and the fallback
+# gets what is left, under the same memory cap, so solve() keeps to the limit. A node
+# budget is split the same way with FALLBACK_NODE_SHARE.
+FALLBACK_WEIGHT = 5
+FALLBACK_MAX_NODES = 200000
+FALLBACK_TIME_SHARE = 0.25
+FALLBACK_NODE_SHARE = 0.25
+
+# --- Board Helpers ---
+
+def board_size(state):
+    return math.isqrt(len(state))
+
+def goal_state(size):
+    return tuple(list(range(1, size*size)) + [0])
+
+def is_solved(state):
+    return tuple(state) == goal_state(board_size(state))
+
+def count_inversions(values):
+    # Pairs i < j with values[i] > values[j], ignoring the blank, by merge sort: O(n log n)
+    # instead of comparing every pair, which matters for 10x10 boards in a shuffle loop
+    tiles = [val for val in values if val != 0]
+    buffer = [0] * len(tiles)
+    inversions = 0
+    width = 1
+    while width < len(tiles):
+        for lo in range(0, len(tiles) - width, 2*width):
+            mid, hi = lo + width, min(lo + 2*width, len(tiles))
+            i, j, k = lo, mid, lo
+            while i < mid and j < hi:
+                if tiles[i] <= tiles[j]:
+                    buffer[k] = tiles[i]
+                    i += 1
+                else:
+                    # tiles[j] is smaller than everything left in the left half
+                    buffer[k] = tiles[j]
+                    inversions += mid - i
+                    j += 1
+                k += 1
+            buffer[k:k + mid - i] = tiles[i:mid]
+            k += mid - i
+            buffer[k:k + hi - j] = tiles[j:hi]
+            tiles[lo:hi] = buffer[lo:hi]
+        width *= 2
+    return inversions
+
+def is_solvable(state):
+    # For an N x N puzzle, solvability depends on N and inversion count
+    flat = list(state)
+    size = board_size(flat)
+    inv_count = count_inversions(flat)
+    # If N is odd, puzzle is solvable if inversion count is even.
+    if size % 2 == 1:
+        return inv_count % 2 == 0
+    # If N is even, the row of the empty tile counted from the bottom (1-based) matters:
+    # solvable if inversions + that row is odd.
+    blank_row_from_bottom = size - flat.index(0) // size
+    return (inv_count + blank_row_from_bottom) % 2 == 1
+
+MAX_SIZE = 10 # Largest board the GUIs offer
+
+def tile_font_size(size, base_size):
+    # Tile font for the GUIs: base_size on the 3x3 board, shrunk on bigger boards so a
+    # 10x10 grid still fits on screen
+    return max(9, base_size * 3 // size)
+
+def random_state(size, rng=random):
+    # A random solvable, unsolved board in one pass: swapping two tiles flips the
+    # inversion parity, so an unsolvable shuffle is fixed instead of thrown away
+    while True:
+        nums = list(range(size*size))
+        rng.shuffle(nums)
+        if not is_solvable(nums):
+            i, j = [idx for idx, val in enumerate(nums) if val != 0][:2]
+            nums[i], nums[j] = nums[j], nums[i]
+        state = tuple(nums)
+        if state != goal_state(size):
+            return state
+
+def parse_state(text):
+    # Accepts "1 2 3 4 5 6 7 8 0", "1,2,3,4,5,6,7,8,0" or "123456780" (3x3 only)
+    text = text.strip()
+    if "," in text or " " in text or "\t" in text:
+        values = [int(tok) for tok in text.replace(",", " ").split()]
+    else:
+        values = [int(ch) for ch in text]
+    size = math.isqrt(len(values))
+    if size < 2 or size*size != len(values) or sorted(values) != list(range(size*size)):
+        raise ValueError(f"not a valid puzzle: {text!r}")
+    return tuple(values)
+
+@lru_cache(maxsize=None)
+def move_table(size):
+    # move_table(size)[blank]: (move code, cell the blank moves to) for each legal move
+    moves_from = []
+    for pos in range(size*size):
+        r, c = divmod(pos, size)
+        moves_from.append(tuple((move, (r+dr)*size + c+dc) for move, (dr, dc) in enumerate(DIRECTIONS)
+                                if 0 <= r+dr < size and 0 <= c+dc < size))
+    return tuple(moves_from)
+
+@lru_cache(maxsize=None)
+def manhattan_table(size):
+    # manhattan_table(size)[tile][pos]: Manhattan distance of a tile standing on pos from
+    # its goal cell (all zero for the blank). When a tile slides from pos to the blank,
+    # h changes by dist[tile][blank] - dist[tile][pos], so h can be updated in O(1).
+    cells = size*size
+    return tuple([tuple([0]*cells)] + [tuple(abs(pos//size - (tile-1)//size) + abs(pos%size - (tile-1)%size)
+                                             for pos in range(cells)) for tile in range(1, cells)])
+
+def get_moves(state):
+    # Each neighbor of the state together with the move code that reaches it
+    zero_pos = state.index(0)
+    moves = []
+    for move, new_pos in move_table(board_size(state))[zero_pos]: # Up, Down, Left, Right
+        new_state_list = list(state)
+        new_state_list[zero_pos], new_state_list[new_pos] = new_state_list[new_pos], new_state_list[zero_pos]
+        moves.append((move, tuple(new_state_list)))
+    return moves
+
+def get_neighbors(state):
+    return [neighbor for move, neighbor in get_moves(state)]
+
+def apply_moves(state, codes):
+    # Replay move codes from a state and return every state along the way
+    size = board_size(state)
+    path = [tuple(state)]
+    board = list(state)
+    zero_pos = board.index(0)
+    for code in codes:
+        dr, dc = DIRECTIONS[code]
+        new_pos = zero_pos + dr*size + dc
+        board[zero_pos], board[new_pos] = board[new_pos], board[zero_pos]
+        zero_pos = new_pos
+        path.append(tuple(board))
+    return path
+
+def path_to_moves(path):
+    # Turn a list of states back into a move string such as "ULDR"
+    size = board_size(path[0])
+    moves = []
+    for prev, cur in zip(path, path[1:]):
+        delta = cur.index(0) - prev.index(0)
+        moves.append(MOVE_NAMES[[-size, size, -1, 1].index(delta)])
+    return "".join(moves)
+
+# --- Packed Integer States ---
+# Optional compact encoding: every cell gets a fixed number of bits (4 up to 4x4) in a
+# single int, cell 0 in the lowest bits, so a 4x4 state fits in 64 bits. Ints hash and
+# compare much faster than tuples in the closed set and g-score dict. The blank holds 0,
+# so sliding a tile is one subtraction at its old cell and one addition at the blank's.
+# The blank's cell is cached next to the int in each frontier entry.
+
+ENCODINGS = ["tuple", "packed"]
+
+def cell_bits(size):
+    return max(4, (size*size - 1).bit_length())
+
+def pack_state(state):
+    bits = cell_bits(board_size(state))
+    packed = 0
+    for idx, val in enumerate(state):
+        packed |= val << (idx*bits)
+    return packed
+
+def unpack_state(packed, size):
+    bits = cell_bits(size)
+    mask = (1 << bits) - 1
+    return tuple((packed >> (idx*bits)) & mask for idx in range(size*size))
+
+def manhattan(state):
+    size = board_size(state)
+    dist = 0
+    for idx, val in enumerate(state):
+        if val == 0: continue
+        target_r, target_c = divmod(val - 1, size)
+        current_r, current_c = divmod(idx, size)
+        dist += abs(target_r - current_r) + abs(target_c - current_c)
+    return dist
+
+@lru_cache(maxsize=None)
+def _line_conflict_moves(goal_order):
+    # goal_order: goal positions, in current order, of the tiles that sit in their goal
+    # row (or column). All but a longest increasing run must step out of the line and
+    # back, which costs each of them 2 extra moves on top of Manhattan distance.
+    longest = [] # Patience sorting: longest[k] = smallest tail of an increasing run of length k+1
+    for goal in goal_order:
+        k = 0
+        while k < len(longest) and longest[k] < goal:
+            k += 1
+        if k == len(longest):
+            longest.append(goal)
+        else:
+            longest[k] = goal
+    return 2 * (len(goal_order) - len(longest))
+
+def linear_conflict(state):
+    # Manhattan distance plus 2 moves for every tile that has to leave its goal row or
+    # column to let another tile past it. Still admissible, and usually far fewer nodes.
+    size = board_size(state)
+    dist = manhattan(state)
+    for line in range(size):
+        row = tuple((val - 1) % size for val in state[line*size:(line + 1)*size]
+                    if val != 0 and (val - 1) // size == line)
+        col = tuple((val - 1) // size for val in state[line::size]
+                    if val != 0 and (val - 1) % size == line)
+        if len(row) > 1:
+            dist += _line_conflict_moves(row)
+        if len(col) > 1:
+            dist += _line_conflict_moves(col)
+    return dist
+
+# Heuristics the A* solver can be told to use by name
+HEURISTICS = ["manhattan", "linear_conflict", "walking_distance", "pdb"]
+
+def get_heuristic(name, size):
+    if name == "manhattan":
+        return manhattan
+    if name == "linear_conflict":
+        return linear_conflict
+    if name == "walking_distance":
+        import puzzle_wd # Imported here so the tables are only built/loaded when asked for
+        return puzzle_wd.load_heuristic(size)
+    if name == "pdb":
+        import puzzle_pdb
+        pdb = puzzle_pdb.load_heuristic() if size == puzzle_pdb.PDB_SIZE else None
+        if pdb is None:
+            raise ValueError("pattern databases only exist for 4x4 once built (python puzzle_pdb.py build)")
+        return pdb
+    raise ValueError(f"unknown heuristic {name!r}, choose from {', '.join(HEURISTICS)}")
+
+def default_heuristic(size):
+    # 4x4 boards use the additive pattern databases when they have been built
+    # (python puzzle_pdb.py build); everything else falls back to Manhattan distance
+    if size == 4:
+        import puzzle_pdb # Imported here because puzzle_pdb itself builds on this module
+        pdb = puzzle_pdb.load_heuristic()
+        if pdb is not None:
+            return pdb
+    return manhattan
+
+# --- Search Node Store ---
+# Every node the solvers create is just (parent index, move code), kept in two flat
+# arrays instead of a full path list per frontier entry. The path is rebuilt only once,
+# by walking the parent links back from the goal node.
+class SearchNodeStore:
+    def __init__(self):
+        self.parents = array('i') # Index of the parent node, -1 for the root
+        self.moves = array('b')   # Move code that led from the parent to this node
+        self.peak_nodes = 0
+
+    def add(self, parent, move):
+        self.parents.append(parent)
+        self.moves.append(move)
+        if len(self.parents) > self.peak_nodes:
+            self.peak_nodes = len(self.parents)
+        return len(self.parents) - 1
+
+    def move_codes(self, node):
+        codes = []
+        while self.parents[node] != -1:
+            codes.append(self.moves[node])
+            node = self.parents[node]
+        codes.reverse()
+        return codes
+
+    def rebuild_path(self, node, start_state):
+        return apply_moves(start_state, self.move_codes(node))
+
+# --- Frontiers ---
+# A* can keep its open set in either of these. Both hold entries whose first field is f.
+#   heap     binary heap (heapq): O(log n) push and pop, ties broken by the smaller g
+#   buckets  one list per f value: O(1) push and pop, newest entry first within an f,
+#            which tends to reach the goal with fewer expansions. Needs integer f, so
+#            only integer weights.
+# By default A* uses buckets when the weight is an integer and the heap otherwise.
+FRONTIERS = ["heap", "buckets"]
+
+class BucketFrontier:
+    def __init__(self):
+        self.buckets = [] # buckets[f]: entries with that f
+        self.min_f = 0 # No entry has a smaller f
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, entry):
+        f = entry[0]
+        while f >= len(self.buckets):
+            self.buckets.append([])
+        self.buckets[f].append(entry)
+        if f < self.min_f:
+            self.min_f = f
+        self.count += 1
+
+    def pop(self):
+        if not self.count:
+            raise IndexError("pop from an empty frontier")
+        while not self.buckets[self.min_f]:
+            self.min_f += 1
+        self.count -= 1
+        return self.buckets[self.min_f].pop()
+
+def make_frontier(kind):
+    # (push, pop, size) functions for an empty frontier of the given kind
+    if kind == "heap":
+        entries = []
+        return partial(heapq.heappush, entries), partial(heapq.heappop, entries), entries.__len__
+    if kind == "buckets":
+        frontier = BucketFrontier()
+        return frontier.push, frontier.pop, frontier.__len__
+    raise ValueError(f"unknown frontier {kind!r}, choose from {', '.join(FRONTIERS)}")
+
+# --- Search Stats ---
+# Filled in by each solver when it finishes or is stopped. The counts are kept in local
+# variables during the search and copied over once, so they cost almost nothing.
+#   pushes         nodes added to the frontier (heap, queue, stack or recursion)
+#   pops           nodes taken off the frontier (= nodes_explored)
+#   stale_pops     pops of states that were already expanded (duplicates left in the frontier)
+#   peak_frontier  largest frontier size (current path length for IDA*)
+#   closed_size    states in the closed/visited set at the end
+#   tt_hits        branches cut by the DFS transposition table (None for other solvers)
+#   tt_replacements  table entries evicted by another state of the same iteration
+#   peak_memory    peak bytes traced by tracemalloc, only when solve(trace_memory=True)
+class SearchStats:
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_frontier = 0
+        self.closed_size = 0
+        self.depth = None # Length of the path found
+        self.peak_memory = None
+        self.tt_hits = None
+        self.tt_replacements = None
+
+    def record(self, pushes, pops, stale_pops, peak_frontier, closed_size):
+        self.pushes = pushes
+        self.pops = pops
+        self.stale_pops = stale_pops
+        self.peak_frontier = peak_frontier
+        self.closed_size = closed_size
+
+    @property
+    def effective_branching_factor(self):
+        # b* such that a uniform tree of the solution depth holds as many nodes as were
+        # generated: pushes + 1 = 1 + b* + b*^2 + ... + b*^depth (found by bisection)
+        if not self.depth or self.pushes <= self.depth:
+            return 1.0 if self.depth else None
+        # b*^depth alone is at most pushes, so b* <= pushes^(1/depth); the series is
+        # summed term by term and cut off once it passes pushes, so it never overflows
+        low, high = 1.0, self.pushes ** (1 / self.depth) + 1
+        for _ in range(60):
+            b = (low + high) / 2
+            total, term = 0.0, 1.0
+            for _ in range(self.depth):
+                term *= b
+                total += term
+                if total > self.pushes:
+                    break
+            if total > self.pushes:
+                high = b
+            else:
+                low = b
+        return round(low, 4)
+
+    def as_dict(self):
+        return {
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "peak_frontier": self.peak_frontier,
+            "closed_size": self.closed_size,
+            "depth": self.depth,
+            "effective_branching_factor": self.effective_branching_factor,
+            "peak_memory": self.peak_memory,
+            "tt_hits": self.tt_hits,
+            "tt_replacements": self.tt_replacements,
+        }
+
+    def summary(self):
+        text = (f"Pushes {self.pushes:,}, pops {self.pops:,} ({self.stale_pops:,} stale), "
+                f"peak frontier {self.peak_frontier:,}, closed {self.closed_size:,}")
+        if self.effective_branching_factor is not None:
+            text += f", b* {self.effective_branching_factor:.3f}"
+        if self.tt_hits is not None:
+            text += f", table hits {self.tt_hits:,}, replaced {self.tt_replacements:,}"
+        if self.peak_memory is not None:
+            text += f", peak mem {self.peak_memory / (1024*1024):.2f} MB"
+        return text
+
+# --- Solve Result ---
+class SolveResult:
+    def __init__(self, algorithm, path, nodes_explored, peak_nodes, elapsed, status="solved",
+                 lower_bound=None, suboptimality=None, from_cache=False, stats=None, error=None):
+        self.algorithm = algorithm
+        self.path = path # List of states from start to goal, or None
+        # "solved", "unsolvable", "not_found", or one of STOP_REASONS if a budget ran out;
+        # batch callers use "error" for a puzzle the solver rejected, with the message in error
+        self.status = status
+        self.error = error
+        self.nodes_explored = nodes_explored
+        self.peak_nodes = peak_nodes
+        self.elapsed = elapsed
+        self.lower_bound = lower_bound # Proven minimum number of moves, if known
+        self.suboptimality = suboptimality # length <= suboptimality * optimal (1.0 = optimal)
+        self.from_cache = from_cache # Path came from an OptimalPathCache, no search was run
+        self.stats = stats if stats is not None else SearchStats()
+
+    @property
+    def solved(self):
+        return self.path is not None
+
+    @property
+    def length(self):
+        return len(self.path) - 1 if self.path is not None else None
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes_explored / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def moves(self):
+        return path_to_moves(self.path) if self.path is not None else None
+
+    def __repr__(self):
+        return (f"SolveResult({self.algorithm!r}, {self.status}, length={self.length}, "
+                f"nodes={self.nodes_explored}, time={self.elapsed:.3f}s)")
+
+# --- Optimal Path Cache ---
+# Every state on an optimal path has that path's remainder as an optimal continuation, so
+# one optimal solve answers the next hint, min-moves or solve from any state along it.
+# Each state maps to (move string of the whole path, offset of the state in it), so a
+# path of length L costs L entries that all share one string. Least recently used states
+# are evicted past max_states. A lock makes it safe to share with solver threads.
+DEFAULT_PATH_CACHE_STATES = 100000
+
+class OptimalPathCache:
+    def __init__(self, max_states=DEFAULT_PATH_CACHE_STATES):
+        self.max_states = max_states
+        self.entries = OrderedDict() # state -> (moves, offset)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add_path(self, path):
+        # path must be an optimal path from path[0] to the goal
+        moves = path_to_moves(path)
+        with self.lock:
+            for offset, state in enumerate(path):
+                self.entries[state] = (moves, offset)
+                self.entries.move_to_end(state)
+            while len(self.entries) > self.max_states:
+                self.entries.popitem(last=False)
+
+    def get(self, state):
+        # Optimal path from state to the goal as a list of states, or None if not cached
+        state = tuple(state)
+        with self.lock:
+            entry = self.entries.get(state)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(state)
+            self.hits += 1
+        moves, offset = entry
+        return apply_moves(state, [MOVE_NAMES.index(move) for move in moves[offset:]])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# --- Core A* Solver ---
+def a_star(start_state, heuristic=None, encoding="tuple", budget=None, weight=1, stats=None, frontier=None):
+    # Returns (path, nodes_explored, peak_nodes). weight > 1 gives weighted A*, which is
+    # faster but only guarantees a path at most `weight` times the optimal length.
+    # heuristic is a function of the state or one of the HEURISTICS names; encoding is
+    # one of ENCODINGS and frontier one of FRONTIERS (None picks one for the weight).
+    size = board_size(start_state)
+    goal = goal_state(size)
+    if heuristic is None:
+        heuristic = default_heuristic(size)
+    elif isinstance(heuristic, str):
+        heuristic = get_heuristic(heuristic, size)
+    if frontier is None:
+        frontier = "buckets" if weight == int(weight) else "heap"
+    if frontier == "buckets":
+        if weight != int(weight):
+            raise ValueError("the bucket frontier needs an integer weight")
+        weight = int(weight) # Keeps f an int (a list index) even for weight=2.0
+    if encoding == "packed":
+        return _a_star_packed(start_state, heuristic, budget, weight, stats, frontier)
+    if encoding != "tuple":
+        raise ValueError(f"unknown encoding {encoding!r}, choose from {', '.join(ENCODINGS)}")
+    # With Manhattan distance, each node's h is carried along in its heap entry and
+    # updated from the delta table for the one tile that moved instead of rescanning
+    incremental = heuristic is manhattan
+    dist = manhattan_table(size)
+    moves_from = move_table(size)
+
+    store = SearchNodeStore()
+    # Frontier of (f_score, g_score, state_tuple, node_index, h_score)
+    push, pop, frontier_size = make_frontier(frontier)
+    h = heuristic(start_state)
+    push((weight*h, 0, start_state, store.add(-1, 0), h))
+
+    closed_set = set() # Use a set for faster lookups
+    g_scores = {start_state: 0} # Stores the g_score (cost from start) for a state
+    nodes_explored = 0
+    pushes, stale_pops, peak_frontier = 1, 0, 1
+
+    try:
+        while frontier_size():
+            f, g, current_state, node, h = pop()
+            nodes_explored += 1
+            if budget is not None and nodes_explored >= budget.next_check:
+                # Nodes come off the heap in f order, so f bounds the optimal length (unweighted)
+                budget.check(nodes_explored, store.peak_nodes, f if weight == 1 else 0)
+
+            if current_state == goal:
+                return store.rebuild_path(node, start_state), nodes_explored, store.peak_nodes
+
+            if current_state in closed_set:
+                stale_pops += 1
+                continue
+            closed_set.add(current_state)
+
+            zero_pos = current_state.index(0)
+            for move, pos in moves_from[zero_pos]:
+                board = list(current_state)
+                tile = board[pos]
+                board[zero_pos], board[pos] = tile, 0
+                neighbor = tuple(board)
+                if neighbor in closed_set:
+                    continue
+
+                new_g = g + 1
+
+                if new_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = new_g
+                    if incremental:
+                        new_h = h - dist[tile][pos] + dist[tile][zero_pos]
+                    else:
+                        new_h = heuristic(neighbor)
+                    push((new_g + weight*new_h, new_g, neighbor, store.add(node, move), new_h))
+                    pushes += 1
+            if frontier_size() > peak_frontier:
+                peak_frontier = frontier_size()
+
+        return None, nodes_explored, store.peak_nodes
+    finally:
+        if stats is not None:
+            stats.record(pushes, nodes_explored, stale_pops, peak_frontier, len(closed_set))
+
+def _a_star_packed(start_state, heuristic, budget=None, weight=1, stats=None, frontier="heap"):
+    # Same search as a_star, keyed on packed ints; only the start and goal are converted
+    size = board_size(start_state)
+    bits = cell_bits(size)
+    mask = (1 << bits) - 1
+    shifts = [pos*bits for pos in range(size*size)]
+    incremental = heuristic is manhattan
+    dist = manhattan_table(size)
+    moves_from = move_table(size)
+    start = pack_state(start_state)
+    goal = pack_state(goal_state(size))
+
+    store = SearchNodeStore()
+    # Frontier of (f_score, g_score, packed_state, blank_cell, node_index, h_score)
+    push, pop, frontier_size = make_frontier(frontier)
+    h = heuristic(start_state)
+    push((weight*h, 0, start, start_state.index(0), store.add(-1, 0), h))
+
+    closed_set = set()
+    g_scores = {start: 0}
+    nodes_explored = 0
+    pushes, stale_pops, peak_frontier = 1, 0, 1
+
+    try:
+        while frontier_size():
+            f, g, current, blank, node, h = pop()
+            nodes_explored += 1
+            if budget is not None and nodes_explored >= budget.next_check:
+                budget.check(nodes_explored, store.peak_nodes, f if weight == 1 else 0)
+
+            if current == goal:
+                return store.rebuild_path(node, start_state), nodes_explored, store.peak_nodes
+
+            if current in closed_set:
+                stale_pops += 1
+                continue
+            closed_set.add(current)
+
+            for move, pos in moves_from[blank]:
+                tile = (current >> shifts[pos]) & mask
+                neighbor = current - (tile << shifts[pos]) + (tile << shifts[blank])
+                if neighbor in closed_set:
+                    continue
+
+                new_g = g + 1
+
+                if new_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = new_g
+                    if incremental:
+                        new_h = h - dist[tile][pos] + dist[tile][blank]
+                    else:
+                        new_h = heuristic(unpack_state(neighbor, size))
+                    push((new_g + weight*new_h, new_g, neighbor, pos, store.add(node, move), new_h))
+                    pushes += 1
+            if frontier_size() > peak_frontier:
+                peak_frontier = frontier_size()
+
+        return None, nodes_explored, store.peak_nodes
+    finally:
+        if stats is not None:
+            stats.record(pushes, nodes_explored, stale_pops, peak_frontier, len(closed_set))
+
+# --- Anytime Repairing A* (ARA*) ---
+# Weighted A* with a falling weight that reuses its work between runs. The first run,
+# at initial_weight, finds a path quickly; then the weight drops by weight_step and the
+# search carries on from the open list it had, instead of starting over. States whose g
+# improves after they were closed wait in an "inconsistent" set and rejoin the open list
+# at the next run. After every run, the proven bound is
+#   min(weight, path length / min(g + h over open and inconsistent states))
+# (that minimum is a lower bound on the optimal length), and it reaches 1.0 once the
+# path is optimal. Keyed on packed states like _a_star_packed; the open list is a heap,
+# since the weights are fractional.
+ARA_INITIAL_WEIGHT = 3.0
+ARA_WEIGHT_STEP = 0.5
+
+def ara_star(start_state, heuristic=None, budget=None, stats=None, initial_weight=ARA_INITIAL_WEIGHT,
+             weight_step=ARA_WEIGHT_STEP, on_solution=None):
+    # Returns (path, nodes_explored, peak_nodes), an optimal path if it runs to the end.
+    # Every better path or tighter bound is passed to on_solution(path, bound) as it is
+    # found, with length <= bound * optimal. If a budget runs out, the SearchStopped it
+    # raises carries the best path so far and its bound.
+    size = board_size(start_state)
+    if heuristic is None:
+        heuristic = default_heuristic(size)
+    elif isinstance(heuristic, str):
+        heuristic = get_heuristic(heuristic, size)
+    bits = cell_bits(size)
+    mask = (1 << bits) - 1
+    shifts = [pos*bits for pos in range(size*size)]
+    incremental = heuristic is manhattan
+    dist = manhattan_table(size)
+    moves_from = move_table(size)
+    start = pack_state(start_state)
+    goal = pack_state(goal_state(size))
+
+    store = SearchNodeStore()
+    nodes = {start: (0, heuristic(start_state), start_state.index(0), store.add(-1, 0))} # state -> (g, h, blank, node)
+    weight = max(1.0, float(initial_weight))
+    open_states = {start}
+    open_heap = [(weight*nodes[start][1], 0, start)] # (g + weight*h, g, state); stale once g improves
+    closed_set = set()
+    inconsistent = set() # Improved after being closed in this run
+    nodes_explored = 0
+    pushes, stale_pops, peak_frontier = 1, 0, 1
+    best_path, best_bound, lower_bound = None, None, 0
+
+    try:
+        while True:
+            # One weighted run: expand until no open state could lead to a shorter path
+            while open_heap:
+                f, g, current = open_heap[0]
+                if current not in open_states or nodes[current][0] != g:
+                    heapq.heappop(open_heap)
+                    stale_pops += 1
+                    continue
+                if goal in nodes and nodes[goal][0] <= f:
+                    break
+                heapq.heappop(open_heap)
+                open_states.discard(current)
+                closed_set.add(current)
+                nodes_explored += 1
+                if budget is not None and nodes_explored >= budget.next_check:
+                    budget.check(nodes_explored, len(nodes), lower_bound)
+
+                _, h, blank, node = nodes[current]
+                for move, pos in moves_from[blank]:
+                    tile = (current >> shifts[pos]) & mask
+                    neighbor = current - (tile << shifts[pos]) + (tile << shifts[blank])
+                    known = nodes.get(neighbor)
+                    if known is not None and known[0] <= g + 1:
+                        continue
+                    if known is not None:
+                        new_h = known[1]
+                    elif incremental:
+                        new_h = h - dist[tile][pos] + dist[tile][blank]
+                    else:
+                        new_h = heuristic(unpack_state(neighbor, size))
+                    nodes[neighbor] = (g + 1, new_h, pos, store.add(node, move))
+                    if neighbor in closed_set:
+                        inconsistent.add(neighbor)
+                    else:
+                        open_states.add(neighbor)
+                        heapq.heappush(open_heap, (g + 1 + weight*new_h, g + 1, neighbor))
+                        pushes += 1
+                if len(open_heap) > peak_frontier:
+                    peak_frontier = len(open_heap)
+
+            if goal not in nodes:
+                return None, nodes_explored, store.peak_nodes
+            length = nodes[goal][0]
+            lowest = min((nodes[state][0] + nodes[state][1] for state in open_states | inconsistent), default=length)
+            lower_bound = min(length, math.ceil(lowest))
+            bound = min(weight, length / lowest) if lowest < length else 1.0
+            if best_path is None or length < len(best_path) - 1 or bound < best_bound:
+                best_path = store.rebuild_path(nodes[goal][3], start_state)
+                best_bound = bound
+                if on_solution is not None:
+                    on_solution(best_path, bound)
+            if bound <= 1.0:
+                return best_path, nodes_explored, store.peak_nodes
+
+            # Next run: lower weight, inconsistent states back in, every open state re-keyed
+            weight = max(1.0, weight - weight_step)
+            open_states |= inconsistent
+            inconsistent.clear()
+            closed_set.clear()
+            open_heap = [(nodes[state][0] + weight*nodes[state][1], nodes[state][0], state) for state in open_states]
+            heapq.heapify(open_heap)
+            pushes += len(open_heap)
+    except SearchStopped as stop:
+        if best_path is not None:
+            stop.path = best_path
+            stop.suboptimality = best_bound
+            stop.lower_bound = max(stop.lower_bound, lower_bound)
+        raise
+    finally:
+        if stats is not None:
+            stats.record(pushes, nodes_explored, stale_pops, peak_frontier, len(nodes))
+
+# --- Core IDA* Solver ---
+def ida_star(start_state, budget=None, stats=None):
+    # Iterative deepening A* on a single board that is changed in place and undone on
+    # the way back, so memory is just the current path. Manhattan distance is updated
+    # by the delta of the one tile that moves, and the inverse of the previous move is
+    # never tried. The start state must be solvable, or the bound keeps growing forever.
+    size = board_size(start_state)
+    board = list(start_state)
+    dist = manhattan_table(size)
+    moves_from = move_table(size)
+
+    path_codes = [] # Move codes of the current path
+    nodes_explored = 0
+    peak_depth = 0
+    FOUND = -1
+
+    def search(blank, g, h, bound, prev_move):
+        nonlocal nodes_explored, peak_depth
+        nodes_explored += 1
+        if budget is not None and nodes_explored >= budget.next_check:
+            # Every path shorter than the current bound has already been ruled out
+            budget.check(nodes_explored, peak_depth + 1, bound)
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0: # Manhattan distance is zero only on the goal
+            return FOUND
+        if g > peak_depth:
+            peak_depth = g
+        minimum = float('inf')
+        for move, pos in moves_from[blank]:
+            if move == prev_move ^ 1: # U/D and L/R codes differ only in the lowest bit
+                continue
+            tile = board[pos]
+            new_h = h - dist[tile][pos] + dist[tile][blank]
+            board[blank], board[pos] = tile, 0
+            path_codes.append(move)
+            t = search(pos, g + 1, new_h, bound, move)
+            if t == FOUND:
+                return FOUND
+            path_codes.pop()
+            board[blank], board[pos] = 0, tile # Undo the move
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    h = manhattan(start_state)
+    bound = h
+    try:
+        while True:
+            t = search(board.index(0), 0, h, bound, -2) # -2 ^ 1 is not a move code
+            if t == FOUND:
+                return apply_moves(start_state, path_codes), nodes_explored, peak_depth + 1
+            if t == float('inf'):
+                return None, nodes_explored, peak_depth + 1
+            bound = t
+    finally:
+        if stats is not None:
+            # Every call is one generated and one expanded node; the frontier is the path
+            stats.record(nodes_explored, nodes_explored, 0, peak_depth + 1, 0)
+
+# --- Core BFS Solver ---
+def bfs(start_state, encoding="tuple", budget=None, stats=None):
+    # Bidirectional BFS: one search grows from the start and one from the goal, always
+    # expanding a whole level of whichever frontier is smaller. Every generated state is
+    # looked up in the other side's map; once a level produces meetings, the shortest
+    # one is kept and the path is stitched from both node stores. Finishing the level
+    # keeps it exactly optimal. nodes_explored counts expansions on both sides.
+    size = board_size(start_state)
+    moves_from = move_table(size)
+    goal_state_tuple = goal_state(size)
+    if encoding == "packed":
+        bits = cell_bits(size)
+        mask = (1 << bits) - 1
+        shifts = [pos*bits for pos in range(size*size)]
+        start, goal = pack_state(start_state), pack_state(goal_state_tuple)
+
+        def expand(state, blank):
+            for move, pos in moves_from[blank]:
+                tile = (state >> shifts[pos]) & mask
+                yield move, state - (tile << shifts[pos]) + (tile << shifts[blank]), pos
+    else:
+        start, goal = start_state, goal_state_tuple
+
+        def expand(state, blank):
+            for move, pos in moves_from[blank]:
+                board = list(state)
+                board[blank], board[pos] = board[pos], 0
+                yield move, tuple(board), pos
+
+    if start == goal:
+        if stats is not None:
+            stats.record(1, 1, 0, 1, 1)
+        return [start_state], 1, 1
+
+    # One side per direction: node store, state -> node index map, and current frontier
+    stores = [SearchNodeStore(), SearchNodeStore()]
+    seen = [{start: stores[0].add(-1, 0)}, {goal: stores[1].add(-1, 0)}]
+    frontiers = [[(start, start_state.index(0), 0)], [(goal, size*size - 1, 0)]] # (state, blank, node)
+    depths = [0, 0]
+    nodes_explored = 0
+    pushes, peak_frontier = 2, 2
+
+    try:
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            store, own, other = stores[side], seen[side], seen[1 - side]
+            best = None # (total length, node on this side, node on the other side)
+            next_frontier = []
+            for state, blank, node in frontiers[side]:
+                nodes_explored += 1
+                if budget is not None and nodes_explored >= budget.next_check:
+                    # No meeting so far, so no path is as short as both depths together
+                    budget.check(nodes_explored, stores[0].peak_nodes + stores[1].peak_nodes, depths[0] + depths[1])
+                for move, neighbor, pos in expand(state, blank):
+                    if neighbor in own:
+                        continue
+                    child = store.add(node, move)
+                    own[neighbor] = child
+                    next_frontier.append((neighbor, pos, child))
+                    if neighbor in other:
+                        other_node = other[neighbor]
+                        total = depths[side] + 1 + len(stores[1 - side].move_codes(other_node))
+                        if best is None or total < best[0]:
+                            best = (total, child, other_node)
+            pushes += len(next_frontier)
+            frontiers[side] = next_frontier
+            depths[side] += 1
+            if len(frontiers[0]) + len(frontiers[1]) > peak_frontier:
+                peak_frontier = len(frontiers[0]) + len(frontiers[1])
+
+            if best is not None:
+                forward_node, backward_node = (best[1], best[2]) if side == 0 else (best[2], best[1])
+                codes = stores[0].move_codes(forward_node)
+                # Backward nodes store moves made away from the goal; undo them in reverse
+                codes += [move ^ 1 for move in reversed(stores[1].move_codes(backward_node))]
+                return apply_moves(start_state, codes), nodes_explored, stores[0].peak_nodes + stores[1].peak_nodes
+
+        return None, nodes_explored, stores[0].peak_nodes + stores[1].peak_nodes
+    finally:
+        if stats is not None:
+            # Both frontiers together; every seen state counts as closed
+            stats.record(pushes, nodes_explored, 0, peak_frontier, len(seen[0]) + len(seen[1]))
+
+# --- Core DFS Solver ---
+# Iterative deepening DFS: depth-limited searches with a growing limit, so the first path
+# found is a shortest one and memory is the current path plus a transposition table.
+# The table has a limited number of slots, each holding one packed state with the
+# shallowest depth it was reached at in the current iteration. Reaching a state again at
+# that depth or deeper cannot find anything new, so that branch is cut (a hit). When two
+# states share a slot the shallower one keeps it, since cutting it saves a bigger
+# subtree; a tie goes to the newcomer. Entries carry the iteration that stored them, so
+# starting an iteration frees every slot without clearing the arrays. The table starts
+# small and grows 4x (rehashing the current iteration) whenever it is half full, up to
+# its slot limit, so short searches do not pay for allocating the full table.
+DFS_TT_SLOTS = 1 << 20 # About 12 MB up to 4x4 (8-byte state, 2-byte depth and iteration)
+DFS_TT_START_SLOTS = 1 << 12
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15 # 2**64 / golden ratio, spreads packed states over the slots
+
+class TranspositionTable:
+    def __init__(self, size, slots=DFS_TT_SLOTS):
+        self.max_slots = slots
+        # Packed states up to 4x4 fit in 64 bits; bigger boards need a list of ints
+        self.wide_keys = cell_bits(size)*size*size > 64
+        self.stamp = 0
+        self.hits = 0
+        self.replacements = 0 # Entries of the current iteration evicted by another state
+        self._allocate(min(slots, DFS_TT_START_SLOTS))
+
+    def _allocate(self, slots):
+        self.slots = slots
+        self.keys = [0] * slots if self.wide_keys else array('Q', bytes(8*slots))
+        self.depths = array('H', bytes(2*slots))
+        self.stamps = array('H', bytes(2*slots)) # Iteration that stored the entry, 0 = free
+        self.used = 0 # Slots holding an entry from the current iteration
+        self.grow_at = slots // 2 if slots < self.max_slots else slots + 1
+
+    def _grow(self):
+        # Move the current iteration's entries into a table 4x the size; where two still
+        # share a slot the shallower one keeps it, as in visit
+        entries = [(self.keys[slot], self.depths[slot]) for slot in range(self.slots) if self.stamps[slot] == self.stamp]
+        self._allocate(min(self.slots * 4, self.max_slots))
+        for key, depth in entries:
+            slot = (key * HASH_MULTIPLIER >> 32) % self.slots
+            if self.stamps[slot] != self.stamp:
+                self.used += 1
+            elif self.depths[slot] <= depth:
+                continue
+            self.keys[slot] = key
+            self.depths[slot] = depth
+            self.stamps[slot] = self.stamp
+
+    def new_iteration(self):
+        self.stamp += 1
+        self.used = 0
+
+    def visit(self, key, depth):
+        # True if key was already reached at this depth or shallower this iteration;
+        # otherwise the visit is recorded (if it wins the slot) and False returned
+        slot = (key * HASH_MULTIPLIER >> 32) % self.slots
+        if self.stamps[slot] != self.stamp:
+            if self.used >= self.grow_at:
+                self._grow()
+                return self.visit(key, depth)
+            self.used += 1
+        elif self.keys[slot] == key:
+            if self.depths[slot] <= depth:
+                self.hits += 1
+                return True
+        elif self.depths[slot] < depth:
+            return False # The entry there is shallower, keep it
+        else:
+            self.replacements += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.stamps[slot] = self.stamp
+        return False
+
+def dfs(start_state, max_depth=None, budget=None, stats=None, tt_slots=DFS_TT_SLOTS):
+    # Returns (path, nodes_explored, peak_nodes) with a shortest path. Each move changes
+    # Manhattan distance by exactly 1, so every path to the goal has its parity: the
+    # limit starts at the Manhattan distance and grows by 2. Within an iteration moves
+    # are tried in Up, Down, Left, Right order, never undoing the previous one.
+    size = board_size(start_state)
+    bits = cell_bits(size)
+    shifts = [pos*bits for pos in range(size*size)]
+    moves_from = move_table(size)
+    board = list(start_state)
+    goal = pack_state(goal_state(size))
+    table = TranspositionTable(size, tt_slots)
+
+    path_codes = [] # Move codes of the current path
+    nodes_explored = 0
+    pushes = 1
+    peak_depth = 0
+    limit = manhattan(start_state)
+
+    def search(key, blank, depth, prev_move):
+        nonlocal nodes_explored, pushes, peak_depth
+        nodes_explored += 1
+        if budget is not None and nodes_explored >= budget.next_check:
+            # Every path shorter than the current limit has already been ruled out
+            budget.check(nodes_explored, table.used + depth, limit)
+        if key == goal:
+            return True
+        if depth == limit or table.visit(key, depth):
+            return False
+        if depth >= peak_depth:
+            peak_depth = depth + 1
+        for move, pos in moves_from[blank]:
+            if move == prev_move ^ 1: # U/D and L/R codes differ only in the lowest bit
+                continue
+            tile = board[pos]
+            board[blank], board[pos] = tile, 0
+            path_codes.append(move)
+            pushes += 1
+            if search(key - (tile << shifts[pos]) + (tile << shifts[blank]), pos, depth + 1, move):
+                return True
+            path_codes.pop()
+            board[blank], board[pos] = 0, tile # Undo the move
+        return False
+
+    try:
+        while max_depth is None or limit <= max_depth:
+            table.new_iteration()
+            if search(pack_state(start_state), board.index(0), 0, -2): # -2 ^ 1 is not a move code
+                return apply_moves(start_state, path_codes), nodes_explored, table.used
+            limit += 2
+        return None, nodes_explored, table.used
+    finally:
+        if stats is not None:
+            # Cut branches count as stale pops; the frontier is the path
+            stats.record(pushes, nodes_explored, table.hits, peak_depth + 1, table.used)
+            stats.tt_hits = table.hits
+            stats.tt_replacements = table.replacements
+
+# --- Hash-Distributed A* (see puzzle_hda.py) ---
+def hda_star(start_state, budget=None, stats=None, workers=None, heuristic=None):
+    import puzzle_hda # Imported here because puzzle_hda itself builds on this module
+    return puzzle_hda.hda_star(start_state, workers, heuristic, budget, stats)
+
+# --- Distance Table Lookup (3x3 only, see puzzle_table.py) ---
+def table_lookup(start_state, budget=None, stats=None): # A lookup is too quick to need a budget
+    import puzzle_table # Imported here because puzzle_table itself builds on this module
+    if board_size(start_state) != puzzle_table.TABLE_SIZE:
+        raise ValueError("the distance table only covers the 3x3 puzzle")
+    path = puzzle_table.load_distance_table().optimal_path(start_state)
+    # One table lookup per state on the path; nothing is stored
+    nodes_explored = len(path) if path else 1
+    if stats is not None:
+        stats.record(nodes_explored, nodes_explored, 0, 1, 0)
+    return path, nodes_explored, 0
+
+SOLVERS = {
+    "astar": a_star,
+    "arastar": ara_star,
+    "hdastar": hda_star,
+    "idastar": ida_star,
+    "bfs": bfs,
+    "dfs": dfs,
+    "table": table_lookup,
+}
+
+# Algorithms whose solutions are always shortest possible
+OPTIMAL_ALGORITHMS = {"astar", "arastar", "hdastar", "idastar", "bfs", "dfs", "table"}
+
+def solve(start_state, algorithm="astar", max_nodes=None, time_limit=None, max_memory_mb=None,
+          cancel=None, cache=None, trace_memory=False, profile=None, **options):
+    # Extra options go straight to the solver, e.g. encoding="packed" for astar/bfs or
+    # heuristic="linear_conflict" for astar.
+    # max_nodes / time_limit (seconds) / max_memory_mb / cancel bound the search; if one
+    # runs out, the result's status says which, and its path (if any) comes from a quick
+    # weighted A* with a suboptimality bound instead of the exact search.
+    # With an OptimalPathCache, optimal algorithms answer from it when they can and add
+    # every optimal path they find to it.
+    # trace_memory=True records the search's peak traced memory in result.stats (slower).
+    # profile runs the search under cProfile: a file name dumps the profile there, and a
+    # cProfile.Profile object collects it (handy to add up many solves).
+    if algorithm not in SOLVERS:
+        raise ValueError(f"unknown algorithm {algorithm!r}, choose from {', '.join(ALGORITHMS)}")
+    start_state = tuple(start_state)
+    start_time = time.perf_counter()
+    if not is_solvable(start_state):
+        return SolveResult(algorithm, None, 0, 0, time.perf_counter() - start_time, status="unsolvable")
+    optimal = algorithm in OPTIMAL_ALGORITHMS
+    if cache is not None and optimal:
+        path = cache.get(start_state)
+        if path is not None:
+            stats = SearchStats()
+            stats.depth = len(path) - 1
+            return SolveResult(algorithm, path, 0, 0, time.perf_counter() - start_time,
+                               lower_bound=len(path) - 1, suboptimality=1.0, from_cache=True, stats=stats)
+    budget = None
+    if max_nodes is not None or time_limit is not None or max_memory_mb is not None or cancel is not None:
+        search_time, search_nodes = time_limit, max_nodes
+        if algorithm != "arastar": # ARA* keeps its own best path
+            if time_limit is not None:
+                search_time = time_limit * (1 - FALLBACK_TIME_SHARE)
+            if max_nodes is not None:
+                search_nodes = max_nodes - int(max_nodes * FALLBACK_NODE_SHARE)
+        budget = SearchBudget(search_nodes, search_time, max_memory_mb, cancel)
+    stats = SearchStats()
+    try:
+        path, nodes_explored, peak_nodes = _run_solver(algorithm, start_state, budget, stats, trace_memory,
+                                                       profile, options)
+    except SearchStopped as stop:
+        return _fallback_result(start_state, algorithm, stop, start_time, cancel, stats, time_limit, max_memory_mb,
+                                max_nodes)
+    if path is None:
+        return SolveResult(algorithm, None, nodes_explored, peak_nodes, time.perf_counter() - start_time,
+                           status="not_found", stats=stats)
+    stats.depth = len(path) - 1
+    if cache is not None and optimal:
+        cache.add_path(path)
+    return SolveResult(algorithm, path, nodes_explored, peak_nodes, time.perf_counter() - start_time,
+                       lower_bound=len(path) - 1 if optimal else None, suboptimality=1.0 if optimal else None,
+                       stats=stats)
+
+def _run_solver(algorithm, start_state, budget, stats, trace_memory, profile, options):
+    # Calls the solver with the optional memory tracing and profiling wrapped around it
+    tracing = trace_memory and not tracemalloc.is_tracing() # Leave an outer trace alone
+    if tracing:
+        tracemalloc.start()
+    profiler = None
+    if profile is not None:
+        profiler = profile if isinstance(profile, cProfile.Profile) else cProfile.Profile()
+        profiler.enable()
+    try:
+        return SOLVERS[algorithm](start_state, budget=budget, stats=stats, **options)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            if not isinstance(profile, cProfile.Profile):
+                profiler.dump_stats(profile)
+        if tracing:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+def _fallback_result(start_state, algorithm, stop, start_time, cancel, stats, time_limit=None, max_memory_mb=None,
+                     max_nodes=None):
+    # Best effort after a budget ran out: a weighted A* path, bounded by both the weight
+    # and the lower bound the stopped search had already proven. The stats stay those of
+    # the stopped search. An anytime search (ARA*) hands back its own best path instead,
+    # even when cancelled.
+    if stop.path is not None:
+        return SolveResult(algorithm, stop.path, stop.nodes_explored, 0, time.perf_counter() - start_time,
+                           status=stop.reason, lower_bound=stop.lower_bound, suboptimality=stop.suboptimality,
+                           stats=stats)
+    if stop.reason == "cancelled":
+        return SolveResult(algorithm, None, stop.nodes_explored, 0, time.perf_counter() - start_time,
+                           status="cancelled", lower_bound=stop.lower_bound, stats=stats)
+    remaining = None
+    if time_limit is not None:
+        remaining = max(0.0, time_limit - (time.perf_counter() - start_time))
+    fallback_nodes = FALLBACK_MAX_NODES
+    if max_nodes is not None:
+        fallback_nodes = max(0, min(fallback_nodes, max_nodes - stop.nodes_explored))
+    try:
+        path, nodes_explored, peak_nodes = a_star(start_state, weight=FALLBACK_WEIGHT,
+                                                  budget=SearchBudget(fallback_nodes, remaining, max_memory_mb, cancel))
+    except SearchStopped as fallback_stop:
+        path, nodes_explored, peak_nodes = None, fallback_stop.nodes_explored, 0
+    suboptimality = None
+    if path is not None:
+        suboptimality = float(FALLBACK_WEIGHT)
+        if stop.lower_bound > 0:
+            suboptimality = min(suboptimality, (len(path) - 1) / stop.lower_bound)
+    return SolveResult(algorithm, path, stop.nodes_explored + nodes_explored, peak_nodes,
+                       time.perf_counter() - start_time, status=stop.reason,
+                       lower_bound=stop.lower_bound, suboptimality=suboptimality, stats=stats)
@@ -0,0 +1,118 @@
+import math
+import mmap
+import os
+from collections import deque
+
+import puzzle_solver
+
+# Complete distance table for the 3x3 (8-puzzle) board.
+# Only 181,440 of the 9! arrangements are reachable, so one backward BFS from the goal
+# gives the exact optimal distance of every state. The table is one byte per permutation
+# rank (UNREACHABLE for the other half), written once to disk and memory-mapped on load.
+# After that, optimal distance is an O(1) lookup and an optimal path is O(depth).
+
+TABLE_SIZE = 3
+UNREACHABLE = 255
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle_tables")
+TABLE_PATH = os.path.join(TABLE_DIR, "distances_3x3.bin")
+
+# --- Permutation Ranking ---
+# Lehmer code: position of the state in lexicographic order of all permutations
+
+def rank(state):
+    n = len(state)
+    remaining = list(range(n))
+    r = 0
+    for i, val in enumerate(state):
+        idx = remaining.index(val)
+        r += idx * math.factorial(n - 1 - i)
+        remaining.pop(idx)
+    return r
+
+def unrank(r, n=TABLE_SIZE*TABLE_SIZE):
+    remaining = list(range(n))
+    state = []
+    for i in range(n):
+        idx, r = divmod(r, math.factorial(n - 1 - i))
+        state.append(remaining.pop(idx))
+    return tuple(state)
+
+# --- Building ---
+
+def build_distance_table(path=TABLE_PATH):
+    goal = puzzle_solver.goal_state(TABLE_SIZE)
+    table = bytearray([UNREACHABLE]) * math.factorial(TABLE_SIZE*TABLE_SIZE)
+    table[rank(goal)] = 0
+    queue = deque([(goal, 0)])
+    while queue:
+        state, dist = queue.popleft()
+        for neighbor in puzzle_solver.get_neighbors(state):
+            r = rank(neighbor)
+            if table[r] == UNREACHABLE:
+                table[r] = dist + 1
+                queue.append((neighbor, dist + 1))
+
+    # Write to a temporary file first so a half-written table is never picked up
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(table)
+    os.replace(tmp_path, path)
+    return path
+
+# --- Lookup ---
+
+class DistanceTable:
+    def __init__(self, path=TABLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) != math.factorial(TABLE_SIZE*TABLE_SIZE):
+            self.data.close()
+            raise ValueError(f"{path} is not a 3x3 distance table")
+
+    def distance(self, state):
+        # Optimal number of moves to the goal, or None if the state is unsolvable
+        dist = self.data[rank(state)]
+        return None if dist == UNREACHABLE else dist
+
+    def next_move(self, state):
+        # (move code, next state) of one optimal move, or None at the goal / if unsolvable
+        dist = self.distance(state)
+        if not dist:
+            return None
+        for move, neighbor in puzzle_solver.get_moves(state):
+            if self.data[rank(neighbor)] == dist - 1:
+                return move, neighbor
+
+    def optimal_path(self, state):
+        # List of states from state to the goal along an optimal route
+        state = tuple(state)
+        if self.distance(state) is None:
+            return None
+        path = [state]
+        step = self.next_move(state)
+        while step is not None:
+            path.append(step[1])
+            step = self.next_move(step[1])
+        return path
+
+    def close(self):
+        self.data.close()
+
+_loaded_table = None
+
+def load_distance_table(path=TABLE_PATH):
+    # Builds the table file the first time, then memory-maps it once per process
+    global _loaded_table
+    if _loaded_table is None or _loaded_table.path != path:
+        if not os.path.exists(path):
+            build_distance_table(path)
+        _loaded_table = DistanceTable(path)
+    return _loaded_table
+
+if __name__ == "__main__":
+    import time
+    start_time = time.perf_counter()
+    build_distance_table()
+    print(f"Wrote {TABLE_PATH} in {time.perf_counter() - start_time:.2f}s")
@@ -0,0 +1,115 @@
+import os
+import time
+from collections import deque
+
+# Walking distance (WD) heuristic, after Ken'ichiro Takahashi.
+# Instead of tracking tiles, track only *rows*: W[i][j] = how many tiles sit in row i
+# whose goal row is j, plus which row the blank is in. One move takes a tile from the
+# row above or below the blank into the blank's row. A BFS over this much smaller
+# state space gives the exact number of vertical moves needed, which is never more than
+# the real number. Columns work the same way with goal columns, and because the goal
+# (blank bottom-right) is symmetric, one table serves both. WD = rows + columns.
+#
+# Tables are built once per board size and cached in puzzle_tables/wd_<N>x<N>.bin as
+# fixed-size records: N*N counts, blank row, distance (one byte each).
+
+WD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle_tables")
+MAX_WD_SIZE = 4 # The 5x5 table has far too many states to build in pure Python
+
+def wd_path(size):
+    return os.path.join(WD_DIR, f"wd_{size}x{size}.bin")
+
+def goal_counts(size):
+    # Row i holds all N tiles that belong there, except the last row, which has the blank
+    counts = [0] * (size*size)
+    for i in range(size):
+        counts[i*size + i] = size - 1 if i == size - 1 else size
+    return tuple(counts)
+
+def build_wd_table(size):
+    goal = (goal_counts(size), size - 1)
+    table = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        counts, blank_row = queue.popleft()
+        dist = table[(counts, blank_row)]
+        for row in (blank_row - 1, blank_row + 1):
+            if not 0 <= row < size:
+                continue
+            # Any goal-row class present in the neighbouring row can move into the blank's row
+            for j in range(size):
+                if counts[row*size + j] == 0:
+                    continue
+                new_counts = list(counts)
+                new_counts[row*size + j] -= 1
+                new_counts[blank_row*size + j] += 1
+                key = (tuple(new_counts), row)
+                if key not in table:
+                    table[key] = dist + 1
+                    queue.append(key)
+    return table
+
+def save_wd_table(table, size, path=None):
+    path = path or wd_path(size)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = bytearray()
+    for (counts, blank_row), dist in table.items():
+        data += bytes(counts)
+        data.append(blank_row)
+        data.append(dist)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+def load_wd_table(size, path=None):
+    path = path or wd_path(size)
+    cells = size*size
+    record = cells + 2
+    with open(path, "rb") as f:
+        data = f.read()
+    table = {}
+    for offset in range(0, len(data), record):
+        counts = tuple(data[offset:offset + cells])
+        table[(counts, data[offset + cells])] = data[offset + cells + 1]
+    return table
+
+class WalkingDistanceHeuristic:
+    def __init__(self, size):
+        if size > MAX_WD_SIZE:
+            raise ValueError(f"walking distance tables are only built up to {MAX_WD_SIZE}x{MAX_WD_SIZE}")
+        self.size = size
+        if not os.path.exists(wd_path(size)):
+            save_wd_table(build_wd_table(size), size)
+        self.table = load_wd_table(size)
+
+    def __call__(self, state):
+        size = self.size
+        rows = [0] * (size*size)
+        cols = [0] * (size*size)
+        blank_row = blank_col = 0
+        for idx, val in enumerate(state):
+            r, c = divmod(idx, size)
+            if val == 0:
+                blank_row, blank_col = r, c
+                continue
+            goal_r, goal_c = divmod(val - 1, size)
+            rows[r*size + goal_r] += 1
+            cols[c*size + goal_c] += 1
+        return self.table[(tuple(rows), blank_row)] + self.table[(tuple(cols), blank_col)]
+
+_loaded = {}
+
+def load_heuristic(size):
+    # Builds and caches the table on first use (well under a second up to 4x4)
+    if size not in _loaded:
+        _loaded[size] = WalkingDistanceHeuristic(size)
+    return _loaded[size]
+
+if __name__ == "__main__":
+    for size in range(2, MAX_WD_SIZE + 1):
+        start_time = time.perf_counter()
+        table = build_wd_table(size)
+        path = save_wd_table(table, size)
+        print(f"Wrote {path}: {len(table)} states in {time.perf_counter() - start_time:.2f}s")
@@ -1,14 +1,18 @@
 import tkinter as tk
-import random
-import heapq
+from tkinter import messagebox
+import sys
 import time
 
+import puzzle_solver
+
 SIZE = 3
+SOLVE_TIME_LIMIT_S = 10 # Past this the shared solver returns its best path so far
 
 class SlidingPuzzle:
-    def __init__(self, root):
+    def __init__(self, root, size=SIZE):
         self.root = root
-        self.root.title("Sliding Puzzle - 8 Puzzle")
+        self.size = size # Board is size x size, from 2 up to puzzle_solver.MAX_SIZE
+        self.root.title(f"Sliding Puzzle - {size*size - 1} Puzzle")
         self.frame = tk.Frame(self.root)
         self.frame.pack()
 
@@ -29,30 +33,26 @@ class SlidingPuzzle:
         self.create_ui()
 
     def shuffle_board(self):
-        while True:
-            nums = list(range(SIZE*SIZE))
-            random.shuffle(nums)
-            self.tiles = [nums[i*SIZE:(i+1)*SIZE] for i in range(SIZE)]
-            if self.is_solvable(nums) and not self.is_solved():
-                break
+        nums = puzzle_solver.random_state(self.size) # Always solvable, never already solved
+        self.tiles = [list(nums[i*self.size:(i+1)*self.size]) for i in range(self.size)]
         self.move_count = 0
         self.update_move_label()
 
     def create_ui(self):
-        for i in range(SIZE):
+        for i in range(self.size):
             row = []
-            for j in range(SIZE):
+            for j in range(self.size):
                 value = self.tiles[i][j]
                 btn = tk.Button(self.frame, text=str(value) if value != 0 else "",
-                                font=("Arial", 24), width=4, height=2,
+                                font=("Arial", puzzle_solver.tile_font_size(self.size, 24)), width=4, height=2,
                                 command=lambda r=i, c=j: self.click_tile(r, c))
                 btn.grid(row=i, column=j)
                 row.append(btn)
             self.buttons.append(row)
 
     def update_ui(self):
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 val = self.tiles[i][j]
                 btn = self.buttons[i][j]
                 btn.config(text=str(val) if val != 0 else "",
@@ -72,25 +72,20 @@ class SlidingPuzzle:
     def find_empty(self, tiles=None):
         if tiles is None:
             tiles = self.tiles
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 if tiles[i][j] == 0:
                     return i, j
 
     def is_solved(self, tiles=None):
         if tiles is None:
             tiles = self.tiles
-        goal = list(range(1, SIZE*SIZE)) + [0]
+        goal = list(range(1, self.size*self.size)) + [0]
         flat = [num for row in tiles for num in row]
         return flat == goal
 
     def is_solvable(self, flat):
-        inv_count = 0
-        for i in range(len(flat)):
-            for j in range(i+1, len(flat)):
-                if flat[i] and flat[j] and flat[i] > flat[j]:
-                    inv_count += 1
-        return inv_count % 2 == 0
+        return puzzle_solver.is_solvable(flat)
 
     def show_victory(self):
         victory = tk.Toplevel(self.root)
@@ -113,63 +108,14 @@ class SlidingPuzzle:
 
     def solve_puzzle(self):
         self.solve_button.config(state="disabled")
-        path = self.a_star_solver()
-        if path is None:
-            tk.messagebox.showinfo("No Solution", "No solution found!")
+        start = tuple(num for row in self.tiles for num in row)
+        result = puzzle_solver.solve(start, "astar", time_limit=SOLVE_TIME_LIMIT_S)
+        if result.path is None:
+            messagebox.showinfo("No Solution", "No solution found!")
             self.solve_button.config(state="normal")
             return
 
-        self.animate_solution(path)
-
-    def a_star_solver(self):
-        start = tuple(num for row in self.tiles for num in row)
-        goal = tuple(list(range(1, SIZE*SIZE)) + [0])
-
-        def get_neighbors(state):
-            zero_pos = state.index(0)
-            neighbors = []
-            r, c = divmod(zero_pos, SIZE)
-            directions = [(-1,0),(1,0),(0,-1),(0,1)]
-            for dr, dc in directions:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < SIZE and 0 <= nc < SIZE:
-                    new_pos = nr*SIZE + nc
-                    new_state = list(state)
-                    new_state[zero_pos], new_state[new_pos] = new_state[new_pos], new_state[zero_pos]
-                    neighbors.append(tuple(new_state))
-            return neighbors
-
-        def manhattan(state):
-            dist = 0
-            for idx, val in enumerate(state):
-                if val == 0:
-                    continue
-                target_r, target_c = divmod(val-1, SIZE)
-                current_r, current_c = divmod(idx, SIZE)
-                dist += abs(target_r - current_r) + abs(target_c - current_c)
-            return dist
-
-        open_set = []
-        heapq.heappush(open_set, (manhattan(start), 0, start, []))
-        closed_set = set()
-
-        while open_set:
-            f, g, current, path = heapq.heappop(open_set)
-            if current == goal:
-                return path
-
-            if current in closed_set:
-                continue
-            closed_set.add(current)
-
-            for neighbor in get_neighbors(current):
-                if neighbor in closed_set:
-                    continue
-                new_g = g + 1
-                new_f = new_g + manhattan(neighbor)
-                heapq.heappush(open_set, (new_f, new_g, neighbor, path + [neighbor]))
-
-        return None
+        self.animate_solution(result.path[1:]) # The states after each move
 
     def animate_solution(self, path):
         # Disable all buttons during animation
@@ -181,7 +127,7 @@ class SlidingPuzzle:
             if index >= len(path):
                 self.solve_button.config(state="normal")
                 # Update tiles to goal
-                self.tiles = [list(path[-1][i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
+                self.tiles = [list(path[-1][i*self.size:(i+1)*self.size]) for i in range(self.size)]
                 self.update_ui()
                 self.move_count += len(path)
                 self.update_move_label()
@@ -189,7 +135,7 @@ class SlidingPuzzle:
                 return
 
             state = path[index]
-            self.tiles = [list(state[i*SIZE:(i+1)*SIZE]) for i in range(SIZE)]
+            self.tiles = [list(state[i*self.size:(i+1)*self.size]) for i in range(self.size)]
             self.update_ui()
             self.root.after(300, step, index+1)
 
@@ -197,6 +143,10 @@ class SlidingPuzzle:
 
 
 if __name__ == "__main__":
+    # python sliding_puzzle.py [size], e.g. 4 for the 15-puzzle
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    if not 2 <= size <= puzzle_solver.MAX_SIZE:
+        sys.exit(f"size must be between 2 and {puzzle_solver.MAX_SIZE}")
     root = tk.Tk()
-    game = SlidingPuzzle(root)
+    game = SlidingPuzzle(root, size)
     root.mainloop()
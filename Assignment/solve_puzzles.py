@@ -0,0 +1,168 @@
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+
+import puzzle_batch
+import puzzle_solver
+
+# Batch command line solver, no display needed.
+# Reads one puzzle per line from a file (or stdin) and prints one result line per puzzle:
+#   <optimal length> <move string> <nodes explored> <seconds>
+# The move string says which way the empty tile travels (U, D, L, R); "-" means no moves.
+# Puzzles without a solution print their status ("unsolvable", "not_found", "invalid",
+# or "error" when the solver rejects the puzzle, with the reason on stderr) in place of
+# the length. If a budget (--max-nodes, --time-limit, --max-memory-mb) ran
+# out, the line ends with the reason and the suboptimality bound of the fallback path,
+# e.g. "45 UULD... 3381 0.0100 deadline <=1.55".
+#
+# With --workers N the puzzles are read up front and solved by N processes (see
+# puzzle_batch.py); a puzzles/s summary goes to stderr. --unordered prints each result as
+# soon as it is ready, prefixed with its puzzle number (1-based) so lines can be matched up.
+#
+# --json prints one JSON object per puzzle instead, with the search stats (pushes, pops,
+# stale pops, peak frontier, closed-set size, effective branching factor, and peak memory
+# with --trace-memory). --profile FILE runs the searches under cProfile and writes the
+# combined profile to FILE (read it with python -m pstats FILE).
+#
+# Examples:
+#   python solve_puzzles.py puzzles.txt
+#   echo "1 2 3 4 5 6 0 7 8" | python solve_puzzles.py --algorithm bfs
+#   python solve_puzzles.py --heuristic walking_distance puzzles_4x4.txt
+#   python solve_puzzles.py --workers 8 --unordered scrambles.txt
+#   python solve_puzzles.py --json --trace-memory --profile astar.prof puzzles.txt
+
+def format_result(result, as_json=False, number=None):
+    if as_json:
+        return json.dumps({
+            "puzzle": number,
+            "status": result.status,
+            "length": result.length,
+            "moves": result.moves,
+            "nodes": result.nodes_explored,
+            "seconds": round(result.elapsed, 6),
+            "suboptimality": result.suboptimality,
+            "from_cache": result.from_cache,
+            "error": result.error,
+            "stats": result.stats.as_dict(),
+        })
+    if result.status == "error":
+        print(f"puzzle {number}: {result.error}", file=sys.stderr)
+    if not result.solved:
+        return f"{result.status} - {result.nodes_explored} {result.elapsed:.4f}"
+    line = f"{result.length} {result.moves or '-'} {result.nodes_explored} {result.elapsed:.4f}"
+    if result.status != "solved":
+        line += f" {result.status} <={result.suboptimality:.2f}"
+    return line
+
+def format_invalid(as_json=False, number=None):
+    if as_json:
+        return json.dumps({"puzzle": number, "status": "invalid"})
+    return "invalid - 0 0.0000"
+
+def iter_puzzles(stream):
+    # Skip blank lines and "#" comments so puzzle files can be annotated
+    for line in stream:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve sliding puzzles without the GUI.")
+    parser.add_argument("input", nargs="?", default="-", help="puzzle file, one puzzle per line (default: stdin)")
+    parser.add_argument("-a", "--algorithm", choices=puzzle_solver.ALGORITHMS, default="astar")
+    parser.add_argument("--packed", action="store_true", help="key A*/BFS search sets on packed int states")
+    parser.add_argument("--heuristic", choices=puzzle_solver.HEURISTICS,
+                        help="A* heuristic (default: pattern databases on 4x4 if built, else manhattan)")
+    parser.add_argument("--frontier", choices=puzzle_solver.FRONTIERS, help="A* open set (default: buckets)")
+    parser.add_argument("--max-nodes", type=int, help="stop each search after this many expanded nodes")
+    parser.add_argument("--time-limit", type=float, help="stop each search after this many seconds")
+    parser.add_argument("--max-memory-mb", type=float, help="stop each search once its stored nodes reach about this size")
+    parser.add_argument("-j", "--workers", type=int, help="solve in this many worker processes (0 = one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=puzzle_batch.DEFAULT_CHUNKSIZE, help="puzzles handed to a worker at a time")
+    parser.add_argument("--unordered", action="store_true", help="with --workers, print results as they finish")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per puzzle, with search stats")
+    parser.add_argument("--trace-memory", action="store_true", help="record each search's peak traced memory (slower)")
+    parser.add_argument("--profile", metavar="FILE", help="run the searches under cProfile and dump the profile to FILE")
+    args = parser.parse_args(argv)
+    if args.profile and args.workers is not None:
+        parser.error("--profile only works without --workers")
+    if args.packed and args.algorithm not in ("astar", "bfs"):
+        parser.error("--packed only applies to the astar and bfs algorithms")
+    if args.heuristic and args.algorithm not in ("astar", "arastar", "hdastar"):
+        parser.error("--heuristic only applies to the astar, arastar and hdastar algorithms")
+    if args.algorithm == "hdastar" and args.workers is not None:
+        parser.error("hdastar runs its own worker processes (one per CPU), leave out --workers")
+    if args.frontier and args.algorithm != "astar":
+        parser.error("--frontier only applies to the astar algorithm")
+    options = {"encoding": "packed"} if args.packed else {}
+    if args.heuristic:
+        options["heuristic"] = args.heuristic
+    if args.frontier:
+        options["frontier"] = args.frontier
+    options.update(max_nodes=args.max_nodes, time_limit=args.time_limit, max_memory_mb=args.max_memory_mb,
+                   trace_memory=args.trace_memory)
+
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        if args.workers is not None:
+            return solve_parallel(stream, args, options)
+        profiler = cProfile.Profile() if args.profile else None
+        for number, line in enumerate(iter_puzzles(stream), 1):
+            try:
+                state = puzzle_solver.parse_state(line)
+            except ValueError:
+                print(format_invalid(args.json, number), flush=True)
+                continue
+            try:
+                result = puzzle_solver.solve(state, args.algorithm, profile=profiler, **options)
+            except ValueError as e:
+                # The options don't fit this puzzle (e.g. --heuristic pdb on 3x3); go on with the rest
+                result = puzzle_solver.SolveResult(args.algorithm, None, 0, 0, 0.0, status="error", error=str(e))
+            print(format_result(result, args.json, number), flush=True)
+        if profiler is not None:
+            profiler.dump_stats(args.profile)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+def solve_parallel(stream, args, options):
+    states = [] # (puzzle number, state) of every valid line
+    invalid = []
+    total = 0
+    for total, line in enumerate(iter_puzzles(stream), 1):
+        try:
+            states.append((total, puzzle_solver.parse_state(line)))
+        except ValueError:
+            invalid.append(total)
+    workers = args.workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    results = puzzle_batch.solve_batch([state for number, state in states], args.algorithm, workers,
+                                       args.chunksize, ordered=not args.unordered, **options)
+    if args.unordered:
+        prefix = "" if args.json else "{} " # JSON lines carry the puzzle number themselves
+        for number in invalid:
+            print(prefix.format(number) + format_invalid(args.json, number), flush=True)
+        for index, result in results:
+            number = states[index][0]
+            print(prefix.format(number) + format_result(result, args.json, number), flush=True)
+    else:
+        next_number = 1 # Invalid lines are printed back in at their place in the input
+        for index, result in results:
+            number = states[index][0]
+            for missing in range(next_number, number):
+                print(format_invalid(args.json, missing), flush=True)
+            print(format_result(result, args.json, number), flush=True)
+            next_number = number + 1
+        for missing in range(next_number, total + 1):
+            print(format_invalid(args.json, missing), flush=True)
+    elapsed = time.perf_counter() - start_time
+    rate = len(states) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(states)} puzzles in {elapsed:.2f}s ({rate:.1f} puzzles/s, {workers} workers)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import random
+import tkinter as tk
+
+import pytest
+
+import new
+import puzzle
+import puzzle_solver
+import puzzle_table
+import sliding_puzzle
+
+# Parity of the three front ends: each one's solve path, on the same seeded boards,
+# must give the optimal length from the 3x3 distance table. Needs a display for Tk.
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display for Tk")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+def _boards():
+    table = puzzle_table.load_distance_table()
+    rng = random.Random(22)
+    return [(state, table.distance(state)) for state in (puzzle_solver.random_state(3, rng) for _ in range(5))]
+
+def _set_board(game, state):
+    game.tiles = [list(state[r*3:(r + 1)*3]) for r in range(3)]
+
+def test_puzzle_py(root, monkeypatch):
+    game = puzzle.SlidingPuzzle(root, 3)
+    paths = []
+    monkeypatch.setattr(game, "animate_solution", paths.append)
+    for state, distance in _boards():
+        _set_board(game, state)
+        game._calculate_min_moves_internal()
+        assert game.min_moves == distance
+        game._start_solving_animation(state)
+        assert len(paths[-1]) - 1 == distance
+
+def test_sliding_puzzle_py(root, monkeypatch):
+    game = sliding_puzzle.SlidingPuzzle(root, 3)
+    paths = []
+    monkeypatch.setattr(game, "animate_solution", paths.append)
+    for state, distance in _boards():
+        _set_board(game, state)
+        game.solve_puzzle()
+        assert len(paths[-1]) == distance # Its paths leave out the start board
+        assert paths[-1][-1] == puzzle_solver.goal_state(3)
+
+def test_new_py(root, monkeypatch):
+    game = new.SlidingPuzzle(root, 3, log_games=False)
+    jobs = []
+    monkeypatch.setattr(game, "_start_solver_job", lambda *args, **options: jobs.append((args, options)))
+    for label in game.algo_options:
+        game.solver_algorithm.set(label)
+        for state, distance in _boards():
+            _set_board(game, state)
+            game.solve_puzzle_gui_wrapper()
+            (kind, job_state, algorithm), options = jobs[-1]
+            options.pop("progress", None) # A _start_solver_job option, not a solve() one
+            options["cache"] = None
+            assert puzzle_solver.solve(job_state, algorithm, **options).length == distance
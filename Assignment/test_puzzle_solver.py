@@ -0,0 +1,154 @@
+import math
+import random
+
+import pytest
+
+import puzzle_solver
+import puzzle_table
+
+# Run from Assignment/: python -m pytest -q
+
+def _walk(size, length, rng):
+    # A board a short random walk from the goal, so 4x4 searches stay quick
+    board = puzzle_solver.goal_state(size)
+    for _ in range(length):
+        board = rng.choice(puzzle_solver.get_neighbors(board))
+    return board
+
+# --- Search Stats ---
+
+def test_effective_branching_factor_large_depth():
+    # Deep solutions with many pushes used to overflow the float series
+    stats = puzzle_solver.SearchStats()
+    stats.pushes, stats.depth = 228761, 90
+    b = stats.effective_branching_factor
+    assert 1.0 < b < 2.0
+    assert "b*" in stats.summary()
+    assert stats.as_dict()["effective_branching_factor"] == b
+    stats.pushes, stats.depth = 10**12, 100000
+    assert 1.0 <= stats.effective_branching_factor < 1.01
+
+def test_effective_branching_factor_matches_series():
+    stats = puzzle_solver.SearchStats()
+    stats.pushes, stats.depth = 1110, 3 # 10 + 100 + 1000
+    assert math.isclose(stats.effective_branching_factor, 10.0, abs_tol=1e-3)
+
+# --- Search Budgets ---
+
+def test_fallback_stays_within_node_budget():
+    rng = random.Random(9)
+    for size, max_nodes in ((4, 1000), (8, 1000), (4, 20000)):
+        state = puzzle_solver.random_state(size, rng)
+        result = puzzle_solver.solve(state, "astar", max_nodes=max_nodes)
+        assert result.status == "node_budget"
+        assert result.nodes_explored <= max_nodes
+
+def test_fallback_uses_its_node_share():
+    # The exact search stops short of this walk, and weighted A* finishes it in what is left
+    state = _walk(4, 80, random.Random(10))
+    result = puzzle_solver.solve(state, "astar", max_nodes=1000, heuristic="manhattan")
+    assert result.status == "node_budget"
+    assert result.stats.pops == 1000 - int(1000 * puzzle_solver.FALLBACK_NODE_SHARE)
+    assert result.path[-1] == puzzle_solver.goal_state(4)
+    assert result.nodes_explored <= 1000
+
+# --- Incremental Manhattan Distance ---
+
+def test_incremental_manhattan_walk():
+    rng = random.Random(6)
+    for size in (3, 4, 5):
+        dist = puzzle_solver.manhattan_table(size)
+        moves_from = puzzle_solver.move_table(size)
+        board = list(puzzle_solver.random_state(size, rng))
+        blank = board.index(0)
+        h = puzzle_solver.manhattan(board)
+        for _ in range(500):
+            move, pos = rng.choice(moves_from[blank])
+            tile = board[pos]
+            h = h - dist[tile][pos] + dist[tile][blank]
+            board[blank], board[pos] = tile, 0
+            blank = pos
+            assert h == puzzle_solver.manhattan(board)
+
+def _checking_frontier(monkeypatch, size, packed):
+    # Every entry the solver pushes carries its h last; compare it with a full recompute
+    make_frontier = puzzle_solver.make_frontier
+
+    def checked(kind):
+        push, pop, frontier_size = make_frontier(kind)
+
+        def push_checked(entry):
+            state = puzzle_solver.unpack_state(entry[2], size) if packed else entry[2]
+            assert entry[-1] == puzzle_solver.manhattan(state)
+            push(entry)
+        return push_checked, pop, frontier_size
+    monkeypatch.setattr(puzzle_solver, "make_frontier", checked)
+
+@pytest.mark.parametrize("encoding", puzzle_solver.ENCODINGS)
+@pytest.mark.parametrize("frontier", puzzle_solver.FRONTIERS)
+def test_incremental_manhattan_in_a_star(monkeypatch, encoding, frontier):
+    rng = random.Random(7)
+    for size in (3, 4):
+        _checking_frontier(monkeypatch, size, encoding == "packed")
+        for _ in range(5):
+            state = puzzle_solver.random_state(size, rng) if size == 3 else _walk(size, 30, rng)
+            path, _, _ = puzzle_solver.a_star(state, heuristic="manhattan", encoding=encoding, frontier=frontier)
+            assert path[-1] == puzzle_solver.goal_state(size)
+        monkeypatch.undo()
+
+# --- DFS Transposition Table ---
+
+def test_transposition_table_grows_and_keeps_entries():
+    table = puzzle_solver.TranspositionTable(4, slots=1 << 14)
+    table.new_iteration()
+    assert table.slots == puzzle_solver.DFS_TT_START_SLOTS
+    keys = range(1, 5000)
+    for key in keys:
+        table.visit(key, 3)
+    assert table.slots == 1 << 14
+    # Whatever survived the collisions and the rehash is still found
+    used = table.used
+    assert sum(table.visit(key, 3) for key in keys) == used
+
+def test_transposition_table_stops_at_its_slot_limit():
+    table = puzzle_solver.TranspositionTable(3, slots=1 << 13)
+    table.new_iteration()
+    for key in range(1, 20000):
+        table.visit(key, 1)
+    assert table.slots == 1 << 13 and table.used <= table.slots
+
+# --- Every Solver Against the Distance Table ---
+
+# (algorithm, options) pairs covering every algorithm, frontier, encoding and heuristic
+SOLVER_CONFIGS = (
+    [("astar", {"heuristic": h, "frontier": f, "encoding": e})
+     for h in ("manhattan", "linear_conflict", "walking_distance")
+     for f in puzzle_solver.FRONTIERS for e in puzzle_solver.ENCODINGS]
+    + [("bfs", {"encoding": e}) for e in puzzle_solver.ENCODINGS]
+    + [("arastar", {}), ("idastar", {}), ("dfs", {}), ("table", {}), ("hdastar", {"workers": 2})]
+)
+
+def _boards_by_distance():
+    # A seeded spread of 3x3 boards with their exact distances
+    table = puzzle_table.load_distance_table()
+    rng = random.Random(22)
+    return [(state, table.distance(state)) for state in (puzzle_solver.random_state(3, rng) for _ in range(6))]
+
+BOARDS = _boards_by_distance()
+
+@pytest.mark.parametrize("algorithm, options", SOLVER_CONFIGS,
+                         ids=[f"{a}-{'-'.join(map(str, o.values()))}" for a, o in SOLVER_CONFIGS])
+def test_solvers_match_distance_table(algorithm, options):
+    for state, distance in BOARDS:
+        result = puzzle_solver.solve(state, algorithm, **options)
+        assert result.status == "solved"
+        assert result.length == distance
+        assert result.path[0] == state and result.path[-1] == puzzle_solver.goal_state(3)
+        stats = result.stats
+        if algorithm == "astar":
+            # Stale pops are only ever the duplicate entries left in the frontier
+            assert stats.stale_pops <= stats.pushes - stats.closed_size
+        elif algorithm == "dfs":
+            assert stats.stale_pops == stats.tt_hits
+        elif algorithm != "arastar":
+            assert stats.stale_pops == 0